@@ -0,0 +1,117 @@
+"""
+Benchmark of the NF3Loader merge strategies with and without the managed merge key indexes.
+
+For every visit count the src tables are filled with synthetic rows via generate_series, then the 3NF tables
+are dropped and loaded twice per scenario: the initial load inserts every row, the re-run matches every row
+(the steady state of a daily run). The benchmark DROPS the src and 3NF tables, so point it at a dedicated
+database:
+
+    PYTHONPATH=. python data_dev/benchmarks/benchmark_nf3_merge.py --database nf3_benchmark --visits 1000000 10000000
+"""
+import argparse
+import time
+
+from data_dev.config import load_config, postgres_config
+from data_dev.queries import (CREATE_SRC_GENERATED_FACILITIES_TABLE_QUERY,
+                              CREATE_SRC_GENERATED_PATIENTS_TABLE_QUERY,
+                              CREATE_SRC_GENERATED_VISITS_TABLE_QUERY)
+from data_dev.src.connectors.postgre_connector import PostgresConnectorContextManager
+from data_dev.src.data.nf3_loader import NF3Loader
+
+FILL_SRC_FACILITIES_QUERY = """
+INSERT INTO src_generated_facilities
+SELECT g, 'Facility ' || g, (ARRAY['Hospital', 'Clinic', 'Urgent Care', 'Specialty Center'])[g], 'Address ' || g,
+       'City', 'State'
+FROM generate_series(1, 4) g;
+"""
+
+FILL_SRC_PATIENTS_QUERY = """
+INSERT INTO src_generated_patients
+SELECT g, 'First' || g, 'Last' || g, DATE '1950-01-01' + (g %% 20000), 'Address ' || g
+FROM generate_series(1, %(num_patients)s) g;
+"""
+
+FILL_SRC_VISITS_QUERY = """
+INSERT INTO src_generated_visits
+SELECT 1 + g %% %(num_patients)s, 1 + g %% 4, TIMESTAMP '2000-01-01' + g * INTERVAL '1 minute',
+       50 + (g %% 495000) / 100.0, 15 + g %% 46
+FROM generate_series(1, %(num_visits)s) g;
+"""
+
+# (merge_strategy, manage_indexes)
+SCENARIOS = [('merge', False), ('merge', True), ('on_conflict', True)]
+
+
+def prepare_src(conn, num_visits, num_patients):
+    """
+    Recreates the src tables and fills them with `num_visits` synthetic visits.
+
+    Args:
+        conn: A psycopg2 database connection object.
+        num_visits (int): The number of src visits.
+        num_patients (int): The number of src patients.
+    """
+    with conn.cursor() as cursor:
+        cursor.execute("DROP TABLE IF EXISTS src_generated_facilities, src_generated_patients, src_generated_visits")
+        cursor.execute(CREATE_SRC_GENERATED_FACILITIES_TABLE_QUERY)
+        cursor.execute(CREATE_SRC_GENERATED_PATIENTS_TABLE_QUERY)
+        cursor.execute(CREATE_SRC_GENERATED_VISITS_TABLE_QUERY)
+        params = {'num_visits': num_visits, 'num_patients': num_patients}
+        cursor.execute(FILL_SRC_FACILITIES_QUERY)
+        cursor.execute(FILL_SRC_PATIENTS_QUERY, params)
+        cursor.execute(FILL_SRC_VISITS_QUERY, params)
+        cursor.execute("ANALYZE src_generated_facilities, src_generated_patients, src_generated_visits")
+    conn.commit()
+
+
+def run_scenario(conn, merge_strategy, manage_indexes):
+    """
+    Drops the 3NF tables and times an initial load and a re-run with the given loader settings.
+
+    Args:
+        conn: A psycopg2 database connection object.
+        merge_strategy (str): 'merge' or 'on_conflict'.
+        manage_indexes (bool): Whether the loader creates the merge key indexes.
+
+    Returns:
+        Tuple[float, float, int]: Initial load seconds, re-run seconds and the number of loaded visits.
+    """
+    with conn.cursor() as cursor:
+        cursor.execute("DROP TABLE IF EXISTS visits, patients, facilities, nf3_load_watermark")
+    conn.commit()
+    load_config.merge_strategy = merge_strategy
+    load_config.manage_indexes = manage_indexes
+    # Re-runs rescan the whole src range, the steady state without the load watermark
+    load_config.use_watermark = False
+    timings = []
+    for _ in range(2):
+        start_time = time.perf_counter()
+        NF3Loader(conn).load_data()
+        timings.append(time.perf_counter() - start_time)
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT COUNT(*) FROM visits")
+        loaded_visits = cursor.fetchone()[0]
+    return timings[0], timings[1], loaded_visits
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--database', required=True, help='Dedicated database to run the benchmark in.')
+    parser.add_argument('--visits', type=int, nargs='+', default=[1000000, 10000000])
+    parser.add_argument('--patients', type=int, default=100000)
+    args = parser.parse_args()
+
+    postgres_config.db = args.database
+    print(f"{'visits':>10} {'strategy':>12} {'indexes':>8} {'initial_s':>10} {'rerun_s':>10} {'loaded':>10}")
+    with PostgresConnectorContextManager() as connection_object:
+        conn = connection_object.get_connection()
+        for num_visits in args.visits:
+            prepare_src(conn, num_visits, args.patients)
+            for merge_strategy, manage_indexes in SCENARIOS:
+                initial, rerun, loaded = run_scenario(conn, merge_strategy, manage_indexes)
+                print(f"{num_visits:>10} {merge_strategy:>12} {str(manage_indexes):>8} "
+                      f"{initial:>10.2f} {rerun:>10.2f} {loaded:>10}")
+
+
+if __name__ == '__main__':
+    main()
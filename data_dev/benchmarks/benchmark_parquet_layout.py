@@ -0,0 +1,143 @@
+"""
+Benchmark of the ParquetStorageConfig layout settings on a synthetic facility_name_min_time_spent_per_visit_date
+dataset.
+
+For every scenario the dataset is written through LoadParquet.write_batches into a fresh directory, then read
+back with a selective filter (one facility over one week) through pyarrow.dataset, the way ReportGenerator and
+the DQ checks read it. The table reports the on-disk size, the write time and the best filtered read time:
+
+    PYTHONPATH=. python data_dev/benchmarks/benchmark_parquet_layout.py --rows 5000000 --output /tmp/layout_bench
+"""
+import argparse
+import os
+import shutil
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+
+from data_dev.config import parquet_storage_config
+from data_dev.src.data.parquet_layout import BLOOM_FILTERS_SUPPORTED
+from data_dev.src.data.parquet_loader import LoadParquet, FACILITY_NAME_MIN_TIME_SPENT_PER_VISIT_DATE_SCHEMA
+
+# (scenario name, ParquetStorageConfig layout overrides)
+SCENARIOS = [
+    ('default', {}),
+    ('zstd-3', {'compression': 'zstd', 'compression_level': 3}),
+    ('gzip-6', {'compression': 'gzip', 'compression_level': 6}),
+    ('zstd-3/rg-64k', {'compression': 'zstd', 'compression_level': 3, 'row_group_size': 65536}),
+    ('zstd-3/sorted', {'compression': 'zstd', 'compression_level': 3,
+                       'sort_columns': ('facility_name', 'visit_date')}),
+    ('zstd-3/sorted/rg-64k', {'compression': 'zstd', 'compression_level': 3, 'row_group_size': 65536,
+                              'sort_columns': ('facility_name', 'visit_date')}),
+    ('zstd-3/sorted/no-dict', {'compression': 'zstd', 'compression_level': 3,
+                               'sort_columns': ('facility_name', 'visit_date'), 'dictionary_columns': ()}),
+    ('zstd-3/sorted/index+bloom', {'compression': 'zstd', 'compression_level': 3,
+                                   'sort_columns': ('facility_name', 'visit_date'), 'write_page_index': True,
+                                   'bloom_filter_columns': ('facility_name',)})
+]
+
+LAYOUT_DEFAULTS = {
+    'compression': 'snappy',
+    'compression_level': None,
+    'row_group_size': None,
+    'sort_columns': (),
+    'dictionary_columns': None,
+    'write_page_index': False,
+    'bloom_filter_columns': (),
+    'bloom_filter_ndv': 10000
+}
+
+
+def generate_batches(num_rows, num_facilities, batch_size=1000000, seed=42):
+    """
+    Generates unsorted synthetic rows of the facility_name_min_time_spent_per_visit_date dataset over ten years.
+
+    Args:
+        num_rows (int): The number of rows.
+        num_facilities (int): The number of distinct facility names.
+        batch_size (int): The number of rows per record batch.
+        seed (int): The random seed.
+
+    Returns:
+        List[pyarrow.RecordBatch]: The record batches.
+    """
+    rng = np.random.default_rng(seed)
+    facility_names = np.array([f'Facility {i}' for i in range(num_facilities)], dtype=object)
+    batches = []
+    for start in range(0, num_rows, batch_size):
+        size = min(batch_size, num_rows - start)
+        visit_dates = np.datetime64('2015-01-01') + rng.integers(0, 3650, size=size).astype('timedelta64[D]')
+        batches.append(pa.RecordBatch.from_pydict({
+            'facility_name': facility_names[rng.integers(0, num_facilities, size=size)],
+            'visit_date': visit_dates.astype('datetime64[ns]'),
+            'min_time_spent': rng.integers(15, 61, size=size),
+            'partition_date': np.datetime_as_string(visit_dates, unit='M')
+        }, schema=FACILITY_NAME_MIN_TIME_SPENT_PER_VISIT_DATE_SCHEMA))
+    return batches
+
+
+def directory_size(path):
+    """
+    Returns the total size in bytes of the files below a directory.
+    """
+    return sum(os.path.getsize(os.path.join(root, name)) for root, _, names in os.walk(path) for name in names)
+
+
+def filtered_read(path, facility_name, first_day, repeats=3):
+    """
+    Reads one facility over one week from a dataset and returns the best time and the number of rows.
+
+    Args:
+        path (str): The dataset directory.
+        facility_name (str): The facility to read.
+        first_day (datetime): The first day of the week.
+        repeats (int): The number of timed reads.
+
+    Returns:
+        Tuple[float, int]: The best read seconds and the number of rows read.
+    """
+    dataset = ds.dataset(path, format='parquet', partitioning='hive')
+    condition = ((pc.field('facility_name') == facility_name)
+                 & (pc.field('visit_date') >= pa.scalar(first_day, pa.timestamp('ns')))
+                 & (pc.field('visit_date') < pa.scalar(first_day + timedelta(days=7), pa.timestamp('ns')))
+                 & (pc.field('partition_date') == first_day.strftime('%Y-%m')))
+    timings = []
+    for _ in range(repeats):
+        start_time = time.perf_counter()
+        num_rows = dataset.to_table(filter=condition).num_rows
+        timings.append(time.perf_counter() - start_time)
+    return min(timings), num_rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--output', required=True, help='Scratch directory the datasets are written to.')
+    parser.add_argument('--rows', type=int, default=5000000)
+    parser.add_argument('--facilities', type=int, default=1000)
+    args = parser.parse_args()
+
+    batches = generate_batches(args.rows, args.facilities)
+    print(f"{'scenario':>28} {'size_mb':>9} {'write_s':>8} {'read_ms':>8} {'rows':>6}")
+    for name, overrides in SCENARIOS:
+        if overrides.get('bloom_filter_columns') and not BLOOM_FILTERS_SUPPORTED:
+            print(f"{name:>28} skipped: the installed pyarrow does not write bloom filters")
+            continue
+        for key, value in {**LAYOUT_DEFAULTS, **overrides}.items():
+            setattr(parquet_storage_config, key, value)
+        path = os.path.join(args.output, name.replace('/', '_'))
+        shutil.rmtree(path, ignore_errors=True)
+        start_time = time.perf_counter()
+        LoadParquet.write_batches(iter(batches), FACILITY_NAME_MIN_TIME_SPENT_PER_VISIT_DATE_SCHEMA, path,
+                                  ['partition_date'])
+        write_seconds = time.perf_counter() - start_time
+        read_seconds, num_rows = filtered_read(path, 'Facility 7', datetime(2020, 3, 2))
+        print(f"{name:>28} {directory_size(path) / 2 ** 20:>9.1f} {write_seconds:>8.2f} "
+              f"{read_seconds * 1000:>8.1f} {num_rows:>6}")
+
+
+if __name__ == '__main__':
+    main()
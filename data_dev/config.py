@@ -1,5 +1,5 @@
 from dataclasses import dataclass
-from typing import List, Tuple
+from typing import List, Optional, Tuple
 from datetime import datetime
 
 
@@ -14,12 +14,19 @@ class PostgresConfig:
         db (str): The name of the database to connect to.
         port (int): The port number on which the PostgreSQL server is running.
         host (str): The hostname or IP address of the PostgreSQL server.
+        pool_min_size (int): The number of connections PostgresConnectionPool opens up front and keeps open. Idle
+                             connections above this number are closed when they are given back.
+        pool_max_size (int): The maximum number of connections PostgresConnectionPool lends out at once.
+        pool_timeout (float): Seconds a checkout waits for a free pooled connection before failing.
     """
     user: str
     password: str
     db: str
     port: int
     host: str
+    pool_min_size: int = 1
+    pool_max_size: int = 4
+    pool_timeout: float = 30.0
 
 
 @dataclass
@@ -34,6 +41,13 @@ class DataGeneratorConfig:
         date_format (str): The format of the date strings (e.g., '%Y-%m-%d').
         facility_types (List[str]): A list of facility types (e.g., "Hospital", "Clinic").
         visits_per_day (Tuple[int, int]): A tuple specifying the range (min, max) of visits per day.
+        generation_mode (str): 'python' builds visits row by row as a list of dictionaries,
+                               'vectorized' builds them column-wise with NumPy into a pandas DataFrame.
+        batch_window_days (int): The number of days of visits generated per batch when visits are streamed.
+                                 In vectorized mode every batch is also a generation shard.
+        num_workers (int): The number of worker processes generating shards in vectorized mode.
+        seed (Optional[int]): The global seed every shard seed is derived from. With a fixed seed the
+                              generated data is reproducible regardless of num_workers.
     """
     num_patients: int
     start_date: str
@@ -41,6 +55,53 @@ class DataGeneratorConfig:
     date_format: str
     facility_types: List[str]
     visits_per_day: Tuple[int, int]
+    generation_mode: str = 'python'
+    batch_window_days: int = 365
+    num_workers: int = 1
+    seed: Optional[int] = None
+
+
+@dataclass
+class FakerVocabularyConfig:
+    """
+    A dataclass to store settings of the cached Faker vocabulary used for high-cardinality data generation.
+
+    Attributes:
+        enabled (bool): Assemble patients and facilities from cached value pools instead of calling Faker per row.
+        locale (str): The Faker locale the pools are sampled with (e.g., 'en_US').
+        pool_size (int): The number of values sampled per pool (first names, last names, addresses, ...).
+        cache_dir (str): The directory where sampled pools are cached, keyed by locale, seed and pool size.
+    """
+    enabled: bool = False
+    locale: str = 'en_US'
+    pool_size: int = 10000
+    cache_dir: str = '/faker_vocabulary'
+
+
+@dataclass
+class SrcInjectionConfig:
+    """
+    A dataclass to store settings for injecting generated data into the src layer.
+
+    Attributes:
+        load_method (str): How rows are written to Postgres: 'copy' streams rows through COPY ... FROM STDIN
+                           (falling back to batched inserts if COPY fails), 'values' uses batched
+                           execute_values inserts and 'row' executes one INSERT per row.
+        batch_size (int): The number of rows sent per COPY chunk or execute_values page.
+        stream_visits (bool): Generate and load visits one date window at a time instead of materializing
+                              the whole date range, which keeps memory bounded for long ranges.
+        mode (str): 'initial' generates the full date range only when `src_generated_visits` is empty;
+                    'append' additionally extends non-empty src tables with the days after the latest
+                    loaded visit up to the generator end_date;
+                    'swap' regenerates the full date range into UNLOGGED staging tables on every run and
+                    atomically swaps them in place of the src tables.
+        append_num_patients (int): The number of new patients added on every append run.
+    """
+    load_method: str = 'copy'
+    batch_size: int = 100000
+    stream_visits: bool = False
+    mode: str = 'initial'
+    append_num_patients: int = 0
 
 
 @dataclass
@@ -55,10 +116,91 @@ class ParquetStorageConfig:
         The file system path where Parquet files for patient_sum_treatment_cost_per_facility_type will be stored.
         storage_path_facility_name_min_time_spent_per_visit_date (str):
         The file system path where Parquet files for facility_name_min_time_spent_per_visit_date will be stored.
+        storage_path_report_summary (Optional[str]): The Parquet file holding the rows of the last days of
+                                                     facility_type_avg_time_spent_per_visit_date, maintained by
+                                                     LoadParquet after every export. None to not maintain it.
+        compression (str): The Parquet compression codec, e.g. 'snappy', 'zstd', 'gzip', 'lz4' or 'none'.
+        compression_level (Optional[int]): The codec level (zstd, gzip, brotli), None for the codec default.
+        row_group_size (Optional[int]): The number of rows per row group, None for the pyarrow default.
+        sort_columns (Tuple[str, ...]): The columns rows are sorted by within a partition before writing, so row
+                                        group and page statistics let readers skip data. Columns missing from a
+                                        dataset are ignored.
+        dictionary_columns (Optional[Tuple[str, ...]]): The columns written with dictionary encoding, None to
+                                                         dictionary-encode every column.
+        write_page_index (bool): Whether to write the column and offset page indexes used for page-level pruning.
+        bloom_filter_columns (Tuple[str, ...]): The columns written with a bloom filter for equality lookups.
+                                                Ignored on pyarrow releases without bloom filter support, such
+                                                as the pinned 19.x.
+        bloom_filter_ndv (int): The expected number of distinct values per column chunk the bloom filters are
+                                sized for.
     """
     storage_path_facility_type_avg_time_spent_per_visit_date: str
     storage_path_patient_sum_treatment_cost_per_facility_type: str
     storage_path_facility_name_min_time_spent_per_visit_date: str
+    storage_path_report_summary: Optional[str] = None
+    compression: str = 'snappy'
+    compression_level: Optional[int] = None
+    row_group_size: Optional[int] = None
+    sort_columns: Tuple[str, ...] = ()
+    dictionary_columns: Optional[Tuple[str, ...]] = None
+    write_page_index: bool = False
+    bloom_filter_columns: Tuple[str, ...] = ()
+    bloom_filter_ndv: int = 10000
+
+
+@dataclass
+class ParquetExportConfig:
+    """
+    Configuration class for exporting the parquet datasets.
+
+    Attributes:
+        extract_method (str): How transform query results are extracted: 'pandas' reads the full result with
+                              pd.read_sql, 'stream' fetches chunks from a server-side cursor and writes them
+                              to parquet batch by batch, 'copy' runs the query as COPY ... TO STDOUT and parses
+                              the CSV stream straight into Arrow record batches without pandas.
+        itersize (int): The number of rows per chunk when extract_method is 'stream'.
+        copy_block_size (int): The number of CSV bytes parsed per Arrow record batch when extract_method is 'copy'.
+        refresh_mode (str): 'full' re-exports every partition on each run, 'incremental' re-exports only the
+                            partitions touched by visits added since the last successful export of the dataset,
+                            tracked by a `visits.id` watermark in the dataset's _export_state.json.
+        num_workers (int): The number of transforms run concurrently, each in its own thread with its own database
+                           connection. 1 runs them one after another on the shared connection.
+        engine (str): 'postgres' runs the three TRANSFORM queries on the server, 'arrow' copies the visits joined
+                      with facilities out once and computes all three datasets from that single scan with Arrow
+                      compute. The 'arrow' engine always exports every partition.
+        use_materialized_views (bool): Maintain each TRANSFORM query as a materialized view with a unique index,
+                                       refreshed concurrently after the 3NF load, and export the 'postgres'
+                                       engine datasets from the views instead of running the queries.
+        skip_unchanged_partitions (bool): Fingerprint every partition of a 'postgres' engine export in SQL (row
+                                          count and sum of row hashes) and rewrite only the partitions whose
+                                          fingerprint changed since the last export, keeping the files of the
+                                          others. Cheapest together with use_materialized_views.
+        report_summary_days (int): The number of days up to the latest visit date kept in the rolling report
+                                   summary at parquet_storage_config.storage_path_report_summary.
+    """
+    extract_method: str = 'pandas'
+    itersize: int = 100000
+    copy_block_size: int = 1 << 24
+    refresh_mode: str = 'full'
+    num_workers: int = 1
+    engine: str = 'postgres'
+    use_materialized_views: bool = False
+    skip_unchanged_partitions: bool = False
+    report_summary_days: int = 7
+
+
+@dataclass
+class CompactionConfig:
+    """
+    Configuration class for compacting the partitions of the parquet datasets.
+
+    Attributes:
+        enabled (bool): Whether the pipeline compacts the parquet datasets after exporting them.
+        target_file_size_mb (int): The target size of a compacted file. A partition is compacted when it holds
+                                   more files than its size needs at this target.
+    """
+    enabled: bool = False
+    target_file_size_mb: int = 128
 
 
 @dataclass
@@ -70,8 +212,23 @@ class LoadConfig:
         last_date (str): The last date for which data should be successfully loaded.
                          This is typically used to track the progress of incremental data loads.
                          The date should be in the format 'YYYY-MM-DD'.
+        merge_strategy (str): How src rows are merged into the 3NF tables: 'merge' runs the MERGE statements,
+                              'on_conflict' runs INSERT ... ON CONFLICT DO NOTHING against the unique keys.
+        manage_indexes (bool): Create the unique indexes on `external_id` and on the
+                               (facility_id, patient_id, visit_timestamp) merge key if they do not exist.
+        use_watermark (bool): Merge only src visits after the stored load watermark, i.e. in
+                              (last watermark, date_scope], instead of rescanning all src visits up to date_scope.
+        partition_visits (bool): Create `visits` as a table range-partitioned by calendar month of visit_timestamp
+                                 (the same months as the `partition_date` of the parquet exports). Only applies
+                                 when `visits` does not exist yet.
+        partition_months_ahead (int): The number of monthly partitions created in advance after date_scope.
     """
     date_scope: str
+    merge_strategy: str = 'merge'
+    manage_indexes: bool = True
+    use_watermark: bool = True
+    partition_visits: bool = False
+    partition_months_ahead: int = 3
 
 
 @dataclass
@@ -83,14 +240,36 @@ class ReportGeneratorConfig:
         storage_path (str): The file system path where the generated reports will be stored.
                             This path is typically a directory.
         parquet_files_path (str): Location of source files.
+        use_cache (bool): Skip rendering and writing the report when the fingerprint of its source files
+                          (names, sizes and modification times) and report parameters matches the fingerprint
+                          stored with the last written report.
+        num_workers (int): The number of processes rendering the reports of ReportGenerator.generate_reports.
+        html_mode (str): 'full' writes self-contained reports with plotly.js inlined and the table as a plotly
+                         table, whose SVG text the Selenium and Robot scrapers read. 'compact' references one
+                         shared plotly.js file in storage_path, embeds the table rows as compact JSON and renders
+                         them as a paginated HTML table.
+        table_page_size (int): The number of table rows per page when html_mode is 'compact'.
+        summary_file_path (Optional[str]): The rolling summary maintained by LoadParquet. When set and holding
+                                           at least the report's window, the report reads it instead of the
+                                           parquet_files_path dataset.
     """
     storage_path: str
     parquet_files_path: str
+    use_cache: bool = False
+    num_workers: int = 1
+    html_mode: str = 'full'
+    table_page_size: int = 50
+    summary_file_path: Optional[str] = None
 
 
 # Instance of LoadConfig
 load_config = LoadConfig(
-    date_scope=datetime.now().date().strftime('%Y-%m-%d')  # Example: '2025-01-01'
+    date_scope=datetime.now().date().strftime('%Y-%m-%d'),  # Example: '2025-01-01'
+    merge_strategy='merge',  # 'merge' or 'on_conflict'
+    manage_indexes=True,
+    use_watermark=True,
+    partition_visits=False,
+    partition_months_ahead=3
 )
 
 # Instance of PostgresConfig
@@ -99,7 +278,10 @@ postgres_config = PostgresConfig(
     password='mypassword',
     db='mydatabase',
     port=5432,  # localhost:5434,  podman_network:5432
-    host='postgres'  # localhost:localhost, podman_network:postgres
+    host='postgres',  # localhost:localhost, podman_network:postgres
+    pool_min_size=4,
+    pool_max_size=4,  # the main connection plus one per concurrent parquet transform
+    pool_timeout=30.0
 )
 
 # Instance of GeneratorConfig
@@ -109,7 +291,28 @@ data_generator_config = DataGeneratorConfig(
     end_date='2030-01-01',
     date_format='%Y-%m-%d',
     facility_types=['Hospital', 'Clinic', 'Urgent Care', 'Specialty Center'],
-    visits_per_day=(7, 10)
+    visits_per_day=(7, 10),
+    generation_mode='python',  # 'python' or 'vectorized'
+    batch_window_days=365,
+    num_workers=1,
+    seed=None
+)
+
+# Instance of FakerVocabularyConfig
+faker_vocabulary_config = FakerVocabularyConfig(
+    enabled=False,
+    locale='en_US',
+    pool_size=10000,
+    cache_dir='/faker_vocabulary'
+)
+
+# Instance of SrcInjectionConfig
+src_injection_config = SrcInjectionConfig(
+    load_method='copy',  # 'copy', 'values' or 'row'
+    batch_size=100000,
+    stream_visits=False,
+    mode='initial',  # 'initial', 'append' or 'swap'
+    append_num_patients=0
 )
 
 # Instance of ParquetStorageConfig
@@ -119,11 +322,44 @@ parquet_storage_config = ParquetStorageConfig(
     storage_path_patient_sum_treatment_cost_per_facility_type='/parquet_data/'
                                                               'patient_sum_treatment_cost_per_facility_type',
     storage_path_facility_name_min_time_spent_per_visit_date='/parquet_data/'
-                                                             'facility_name_min_time_spent_per_visit_date'
+                                                             'facility_name_min_time_spent_per_visit_date',
+    storage_path_report_summary=None,
+    compression='snappy',
+    compression_level=None,
+    row_group_size=None,
+    sort_columns=(),
+    dictionary_columns=None,
+    write_page_index=False,
+    bloom_filter_columns=(),
+    bloom_filter_ndv=10000
+)
+
+# Instance of ParquetExportConfig
+parquet_export_config = ParquetExportConfig(
+    extract_method='pandas',  # 'pandas', 'stream' or 'copy'
+    itersize=100000,
+    copy_block_size=1 << 24,
+    refresh_mode='full',  # 'full' or 'incremental'
+    num_workers=1,
+    engine='postgres',  # 'postgres' or 'arrow'
+    use_materialized_views=False,
+    skip_unchanged_partitions=False,
+    report_summary_days=7
+)
+
+# Instance of CompactionConfig
+compaction_config = CompactionConfig(
+    enabled=False,
+    target_file_size_mb=128
 )
 
 # Instance of ReportGeneratorConfig
 report_generator_config = ReportGeneratorConfig(
     storage_path='/generated_report',
-    parquet_files_path='/parquet_data/facility_type_avg_time_spent_per_visit_date'
+    parquet_files_path='/parquet_data/facility_type_avg_time_spent_per_visit_date',
+    use_cache=False,
+    num_workers=1,
+    html_mode='full',  # 'full' or 'compact'
+    table_page_size=50,
+    summary_file_path=None
 )
@@ -1,7 +1,9 @@
-from src.connectors.postgre_connector import PostgresConnectorContextManager
+from src.connectors.postgre_connector import PostgresConnectionPool
 from src.data.inject_generated_data_to_src import GeneratedDataLoader
 from src.data.nf3_loader import NF3Loader
 from src.data.parquet_loader import LoadParquet
+from src.data.transform_views import TransformViews
+from src.data.parquet_compactor import ParquetCompactor
 from src.reporting.report_generator import ReportGenerator
 
 import logging
@@ -12,7 +14,7 @@ logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(
 
 
 def main():
-    with PostgresConnectorContextManager() as connection_object:
+    with PostgresConnectionPool() as connection_pool, connection_pool.connection() as connection_object:
         # generate and load generated data into src layer
         try:
             logging.info(f"Starting data generation and injection into Postgres...")
@@ -29,14 +31,34 @@ def main():
             logging.info(f"Transformation of injected data completed!")
         except Exception as e:
             logging.exception(f"Transformation of injected data FAILED: {e}")
-        # load parquet files
+        # refresh materialized views of the transforms
+        views_refreshed = False
         try:
-            logging.info(f"Starting transformation of parquet files...")
-            ld = LoadParquet(connection_object)
-            ld.load_parquet()
-            logging.info(f"Transformation of parquet files completed!")
+            logging.info(f"Starting refresh of transform views...")
+            tv = TransformViews(connection_object.get_connection())
+            tv.refresh_views()
+            views_refreshed = True
+            logging.info(f"Refresh of transform views completed!")
         except Exception as e:
-            logging.exception(f"Transformation of parquet files FAILED: {e}")
+            logging.exception(f"Refresh of transform views FAILED: {e}")
+        # load parquet files, unless the views they are exported from are stale
+        if views_refreshed:
+            try:
+                logging.info(f"Starting transformation of parquet files...")
+                ld = LoadParquet(connection_object, connection_factory=connection_pool.connection)
+                ld.load_parquet()
+                logging.info(f"Transformation of parquet files completed!")
+            except Exception as e:
+                logging.exception(f"Transformation of parquet files FAILED: {e}")
+        else:
+            logging.error(f"Transformation of parquet files SKIPPED: the transform views were not refreshed")
+        # compact parquet files
+        try:
+            logging.info(f"Starting compaction of parquet files...")
+            ParquetCompactor().compact()
+            logging.info(f"Compaction of parquet files completed!")
+        except Exception as e:
+            logging.exception(f"Compaction of parquet files FAILED: {e}")
         try:
             logging.info(f"Starting report generation...")
             rp = ReportGenerator()
@@ -47,6 +47,65 @@ INSERT INTO src_generated_visits (patient_id, facility_id, visit_timestamp, trea
 VALUES (%(patient_id)s, %(facility_id)s, %(visit_timestamp)s, %(treatment_cost)s, %(duration_minutes)s)
 """
 
+SELECT_SRC_GENERATED_HIGH_WATER_MARKS_QUERY = """
+SELECT
+    (SELECT MAX(visit_timestamp) FROM src_generated_visits) AS max_visit_timestamp,
+    (SELECT MAX(patient_id) FROM src_generated_patients) AS max_patient_id,
+    (SELECT MAX(facility_id) FROM src_generated_facilities) AS max_facility_id;
+"""
+
+CREATE_SRC_GENERATED_VISITS_TIMESTAMP_INDEX_QUERY = """
+CREATE INDEX IF NOT EXISTS src_generated_visits_visit_timestamp_idx ON src_generated_visits (visit_timestamp);
+"""
+
+CREATE_SRC_STAGING_SCHEMA_QUERY = """
+CREATE SCHEMA IF NOT EXISTS src_staging;
+"""
+
+CREATE_SRC_STAGING_TABLE_QUERY = """
+DROP TABLE IF EXISTS src_staging.{table_name};
+CREATE UNLOGGED TABLE src_staging.{table_name} (LIKE public.{table_name} INCLUDING DEFAULTS);
+"""
+
+ANALYZE_SRC_STAGING_TABLE_QUERY = """
+ANALYZE src_staging.{table_name};
+"""
+
+SWAP_SRC_STAGING_TABLE_QUERY = """
+DROP TABLE public.{table_name};
+ALTER TABLE src_staging.{table_name} SET SCHEMA public;
+"""
+
+COPY_SRC_GENERATED_FACILITIES_QUERY = """
+COPY src_generated_facilities (facility_id, facility_name, facility_type, address, city, state)
+FROM STDIN WITH (FORMAT csv)
+"""
+
+COPY_SRC_GENERATED_PATIENTS_QUERY = """
+COPY src_generated_patients (patient_id, first_name, last_name, date_of_birth, address)
+FROM STDIN WITH (FORMAT csv)
+"""
+
+COPY_SRC_GENERATED_VISITS_QUERY = """
+COPY src_generated_visits (patient_id, facility_id, visit_timestamp, treatment_cost, duration_minutes)
+FROM STDIN WITH (FORMAT csv)
+"""
+
+INSERT_SRC_GENERATED_FACILITIES_VALUES_QUERY = """
+INSERT INTO src_generated_facilities (facility_id, facility_name, facility_type, address, city, state)
+VALUES %s
+"""
+
+INSERT_SRC_GENERATED_PATIENTS_VALUES_QUERY = """
+INSERT INTO src_generated_patients (patient_id, first_name, last_name, date_of_birth, address)
+VALUES %s
+"""
+
+INSERT_SRC_GENERATED_VISITS_VALUES_QUERY = """
+INSERT INTO src_generated_visits (patient_id, facility_id, visit_timestamp, treatment_cost, duration_minutes)
+VALUES %s
+"""
+
 # 3NF LAYER
 
 
@@ -86,6 +145,79 @@ CREATE TABLE IF NOT EXISTS visits (
 );
 """
 
+CREATE_VISITS_PARTITIONED_TABLE_QUERY = """
+CREATE TABLE IF NOT EXISTS visits (
+    id SERIAL, -- Auto-incrementing id
+    patient_id INT NOT NULL, -- Foreign key referencing the patients table
+    facility_id INT NOT NULL, -- Foreign key referencing the facilities table
+    visit_timestamp TIMESTAMP NOT NULL, -- Timestamp of the visit, the partition key
+    treatment_cost NUMERIC(10, 2) NOT NULL, -- Cost of the treatment
+    duration_minutes INT NOT NULL, -- Duration of the visit in minutes
+    PRIMARY KEY (id, visit_timestamp), -- The partition key has to be part of the primary key
+    FOREIGN KEY (patient_id) REFERENCES patients(id) ON DELETE CASCADE,
+    FOREIGN KEY (facility_id) REFERENCES facilities(id) ON DELETE CASCADE
+) PARTITION BY RANGE (visit_timestamp);
+"""
+
+CREATE_VISITS_PARTITION_QUERY = """
+CREATE TABLE IF NOT EXISTS {partition_name} PARTITION OF visits
+FOR VALUES FROM (%(lower_bound)s) TO (%(upper_bound)s);
+"""
+
+SELECT_VISITS_RELKIND_QUERY = """
+SELECT relkind FROM pg_class WHERE oid = 'visits'::regclass;
+"""
+
+SELECT_SRC_GENERATED_VISITS_MIN_TIMESTAMP_QUERY = """
+SELECT MIN(visit_timestamp)
+FROM src_generated_visits
+WHERE visit_timestamp >= %(lower_bound)s
+    AND visit_timestamp < %(upper_bound)s;
+"""
+
+CREATE_FACILITIES_EXTERNAL_ID_INDEX_QUERY = """
+CREATE UNIQUE INDEX IF NOT EXISTS facilities_external_id_uidx ON facilities (external_id);
+"""
+
+CREATE_PATIENTS_EXTERNAL_ID_INDEX_QUERY = """
+CREATE UNIQUE INDEX IF NOT EXISTS patients_external_id_uidx ON patients (external_id);
+"""
+
+CREATE_VISITS_MERGE_KEY_INDEX_QUERY = """
+CREATE UNIQUE INDEX IF NOT EXISTS visits_merge_key_uidx ON visits (facility_id, patient_id, visit_timestamp);
+"""
+
+CREATE_VISITS_VISIT_DATE_INDEX_QUERY = """
+CREATE INDEX IF NOT EXISTS visits_visit_date_idx ON visits ((visit_timestamp::date));
+"""
+
+CREATE_LOAD_WATERMARK_TABLE_QUERY = """
+CREATE TABLE IF NOT EXISTS nf3_load_watermark (
+    table_name VARCHAR(100) PRIMARY KEY, -- Name of the incrementally loaded 3NF table
+    watermark TIMESTAMP NOT NULL, -- Exclusive upper bound of the source range merged so far
+    updated_at TIMESTAMP NOT NULL DEFAULT now() -- Time of the last watermark advance
+);
+"""
+
+SELECT_LOAD_WATERMARK_QUERY = """
+SELECT watermark FROM nf3_load_watermark WHERE table_name = %(table_name)s FOR UPDATE;
+"""
+
+SELECT_SRC_VISITS_WATERMARK_QUERY = """
+SELECT LEAST(MAX(visit_timestamp) + INTERVAL '1 microsecond', %(upper_bound)s)
+FROM src_generated_visits
+WHERE visit_timestamp >= %(lower_bound)s
+    AND visit_timestamp < %(upper_bound)s;
+"""
+
+UPSERT_LOAD_WATERMARK_QUERY = """
+INSERT INTO nf3_load_watermark (table_name, watermark)
+VALUES (%(table_name)s, %(watermark)s)
+ON CONFLICT (table_name) DO UPDATE
+SET watermark = GREATEST(nf3_load_watermark.watermark, EXCLUDED.watermark),
+    updated_at = now();
+"""
+
 MERGE_FACILITIES_QUERY = """
 MERGE INTO facilities AS target
 USING public.src_generated_facilities AS source
@@ -108,9 +240,10 @@ WHEN NOT MATCHED THEN
     VALUES (source.patient_id, source.first_name, source.last_name, source.date_of_birth, source.address);
 """
 
+# src visits sharing a merge key are merged once, keeping the highest treatment_cost, then the longest duration
 MERGE_VISITS_QUERY = """
 WITH src_visits AS (
-    SELECT 
+    SELECT DISTINCT ON (f.id, p.id, sgv.visit_timestamp)
         f.id AS facility_id,
         p.id AS patient_id,
         sgv.visit_timestamp,
@@ -121,13 +254,18 @@ WITH src_visits AS (
         ON sgv.facility_id = f.external_id 
     JOIN patients p
         ON sgv.patient_id = p.external_id 
-    WHERE visit_timestamp::date <= %(date_scope)s
+    WHERE sgv.visit_timestamp >= %(lower_bound)s
+        AND sgv.visit_timestamp < %(upper_bound)s
+    ORDER BY f.id, p.id, sgv.visit_timestamp, sgv.treatment_cost DESC, sgv.duration_minutes DESC
 )
 MERGE INTO visits AS target
 USING src_visits AS source
 ON target.facility_id = source.facility_id
    AND target.patient_id = source.patient_id
    AND target.visit_timestamp = source.visit_timestamp
+   -- every source row is inside the range, so this only lets partitioned targets prune partitions
+   AND target.visit_timestamp >= %(lower_bound)s
+   AND target.visit_timestamp < %(upper_bound)s
 WHEN MATCHED THEN
     DO NOTHING
 WHEN NOT MATCHED THEN
@@ -135,6 +273,40 @@ WHEN NOT MATCHED THEN
     VALUES (source.facility_id, source.patient_id, source.visit_timestamp, source.treatment_cost, source.duration_minutes);
 """
 
+INSERT_ON_CONFLICT_FACILITIES_QUERY = """
+INSERT INTO facilities (external_id, facility_name, facility_type, address, city, state)
+SELECT facility_id, facility_name, facility_type, address, city, state
+FROM public.src_generated_facilities
+ON CONFLICT (external_id) DO NOTHING;
+"""
+
+INSERT_ON_CONFLICT_PATIENTS_QUERY = """
+INSERT INTO patients (external_id, first_name, last_name, date_of_birth, address)
+SELECT patient_id, first_name, last_name, date_of_birth, address
+FROM public.src_generated_patients
+ON CONFLICT (external_id) DO NOTHING;
+"""
+
+# Same rule for src visits sharing a merge key as MERGE_VISITS_QUERY
+INSERT_ON_CONFLICT_VISITS_QUERY = """
+INSERT INTO visits (facility_id, patient_id, visit_timestamp, treatment_cost, duration_minutes)
+SELECT DISTINCT ON (f.id, p.id, sgv.visit_timestamp)
+    f.id AS facility_id,
+    p.id AS patient_id,
+    sgv.visit_timestamp,
+    sgv.treatment_cost,
+    sgv.duration_minutes
+FROM src_generated_visits sgv
+JOIN facilities f
+    ON sgv.facility_id = f.external_id
+JOIN patients p
+    ON sgv.patient_id = p.external_id
+WHERE sgv.visit_timestamp >= %(lower_bound)s
+    AND sgv.visit_timestamp < %(upper_bound)s
+ORDER BY f.id, p.id, sgv.visit_timestamp, sgv.treatment_cost DESC, sgv.duration_minutes DESC
+ON CONFLICT (facility_id, patient_id, visit_timestamp) DO NOTHING;
+"""
+
 # PARQUET PREPARATION
 
 TRANSFORM_FACILITY_TYPE_AVG_TIME_SPENT_PER_VISIT_DATE_SQL = """
@@ -208,3 +380,162 @@ GROUP BY
     f.facility_name,
     visit_date;
 """
+
+# Snapshot the single-scan parquet engine computes all three transforms from
+SELECT_VISITS_WITH_FACILITIES_SQL = """
+SELECT
+    v.patient_id,
+    v.visit_timestamp,
+    v.treatment_cost,
+    v.duration_minutes,
+    f.facility_name,
+    f.facility_type
+FROM
+    visits v
+JOIN facilities f
+    ON f.id = v.facility_id;
+"""
+
+SELECT_PATIENT_NAMES_SQL = """
+SELECT
+    id AS patient_id,
+    first_name,
+    last_name
+FROM
+    patients;
+"""
+
+COPY_QUERY_TO_STDOUT_QUERY = """
+COPY ({query}) TO STDOUT WITH (FORMAT csv, HEADER true)
+"""
+
+SELECT_VISITS_HIGH_WATER_MARK_QUERY = """
+SELECT COALESCE(MAX(id), 0) AS high_water_mark FROM visits;
+"""
+
+SELECT_TOUCHED_VISIT_MONTHS_QUERY = """
+SELECT DISTINCT to_char(visit_timestamp, 'YYYY-MM') AS partition
+FROM visits
+WHERE id > %(watermark)s
+    AND id <= %(high_water_mark)s;
+"""
+
+SELECT_TOUCHED_FACILITY_TYPES_QUERY = """
+SELECT DISTINCT replace(f.facility_type, ' ', '_') AS partition
+FROM visits v
+JOIN facilities f
+    ON f.id = v.facility_id
+WHERE v.id > %(watermark)s
+    AND v.id <= %(high_water_mark)s;
+"""
+
+FILTER_EXPORT_BY_PARTITION_DATE_QUERY = """
+SELECT *
+FROM ({query}) AS export
+WHERE export.visit_date >= %(lower_bound)s
+    AND export.visit_date < %(upper_bound)s
+    AND to_char(export.visit_date, 'YYYY-MM') = ANY(%(partitions)s)
+"""
+
+FILTER_EXPORT_BY_FACILITY_TYPE_PARTITION_QUERY = """
+SELECT *
+FROM ({query}) AS export
+WHERE replace(export.facility_type, ' ', '_') = ANY(%(partitions)s)
+"""
+
+# Order-independent content fingerprints of the partitions of a transform query result, row count and sum of row hashes
+SELECT_PARTITION_DATE_FINGERPRINTS_QUERY = """
+SELECT
+    to_char(export.visit_date, 'YYYY-MM') AS partition,
+    COUNT(*) || ':' || SUM(hashtextextended(export::text, 0)) AS fingerprint
+FROM ({query}) AS export
+GROUP BY partition
+"""
+
+SELECT_FACILITY_TYPE_PARTITION_FINGERPRINTS_QUERY = """
+SELECT
+    replace(export.facility_type, ' ', '_') AS partition,
+    COUNT(*) || ':' || SUM(hashtextextended(export::text, 0)) AS fingerprint
+FROM ({query}) AS export
+GROUP BY partition
+"""
+
+SELECT_HEALTH_CHECK_QUERY = """
+SELECT 1;
+"""
+
+# Materialized views of the TRANSFORM queries, {query} is the TRANSFORM query without its trailing ';'
+
+SELECT_RELATION_EXISTS_QUERY = """
+SELECT to_regclass(%(relation_name)s) IS NOT NULL AS relation_exists;
+"""
+
+CREATE_FACILITY_TYPE_AVG_TIME_SPENT_PER_VISIT_DATE_VIEW_QUERY = """
+CREATE MATERIALIZED VIEW IF NOT EXISTS mv_facility_type_avg_time_spent_per_visit_date AS
+{query};
+"""
+
+CREATE_FACILITY_TYPE_AVG_TIME_SPENT_PER_VISIT_DATE_VIEW_INDEX_QUERY = """
+CREATE UNIQUE INDEX IF NOT EXISTS mv_facility_type_avg_time_spent_per_visit_date_key
+ON mv_facility_type_avg_time_spent_per_visit_date (facility_type, visit_date);
+"""
+
+CREATE_PATIENT_SUM_TREATMENT_COST_PER_FACILITY_TYPE_VIEW_QUERY = """
+CREATE MATERIALIZED VIEW IF NOT EXISTS mv_patient_sum_treatment_cost_per_facility_type AS
+{query};
+"""
+
+CREATE_PATIENT_SUM_TREATMENT_COST_PER_FACILITY_TYPE_VIEW_INDEX_QUERY = """
+CREATE UNIQUE INDEX IF NOT EXISTS mv_patient_sum_treatment_cost_per_facility_type_key
+ON mv_patient_sum_treatment_cost_per_facility_type (facility_type, full_name);
+"""
+
+# Rows of the UNION ALL branches repeat, row_seq numbers them so every row has a unique key
+CREATE_FACILITY_NAME_MIN_TIME_SPENT_PER_VISIT_DATE_VIEW_QUERY = """
+CREATE MATERIALIZED VIEW IF NOT EXISTS mv_facility_name_min_time_spent_per_visit_date AS
+SELECT
+    transform.facility_name,
+    transform.visit_date,
+    transform.min_time_spent,
+    ROW_NUMBER() OVER (
+        PARTITION BY transform.facility_name, transform.visit_date
+        ORDER BY transform.min_time_spent
+    ) AS row_seq
+FROM ({query}) AS transform;
+"""
+
+CREATE_FACILITY_NAME_MIN_TIME_SPENT_PER_VISIT_DATE_VIEW_INDEX_QUERY = """
+CREATE UNIQUE INDEX IF NOT EXISTS mv_facility_name_min_time_spent_per_visit_date_key
+ON mv_facility_name_min_time_spent_per_visit_date (facility_name, visit_date, row_seq);
+"""
+
+REFRESH_MATERIALIZED_VIEW_CONCURRENTLY_QUERY = """
+REFRESH MATERIALIZED VIEW CONCURRENTLY {view_name};
+"""
+
+SELECT_FACILITY_TYPE_AVG_TIME_SPENT_PER_VISIT_DATE_VIEW_SQL = """
+SELECT
+    facility_type,
+    visit_date,
+    avg_time_spent
+FROM
+    mv_facility_type_avg_time_spent_per_visit_date;
+"""
+
+SELECT_PATIENT_SUM_TREATMENT_COST_PER_FACILITY_TYPE_VIEW_SQL = """
+SELECT
+    facility_type,
+    full_name,
+    sum_treatment_cost
+FROM
+    mv_patient_sum_treatment_cost_per_facility_type;
+"""
+
+SELECT_FACILITY_NAME_MIN_TIME_SPENT_PER_VISIT_DATE_VIEW_SQL = """
+SELECT
+    facility_name,
+    visit_date,
+    min_time_spent
+FROM
+    mv_facility_name_min_time_spent_per_visit_date;
+"""
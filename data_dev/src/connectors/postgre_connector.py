@@ -1,11 +1,17 @@
-from typing import Optional
+import logging
+import threading
+from contextlib import contextmanager
+from typing import BinaryIO, Iterator, Optional, Union
+from uuid import uuid4
 import psycopg2
-from psycopg2.extensions import connection
+from psycopg2.extensions import connection, TRANSACTION_STATUS_IDLE
+from psycopg2.pool import PoolError, ThreadedConnectionPool
 
 import pandas as pd
 from pandas import DataFrame
 
 from data_dev.config import postgres_config
+from data_dev.queries import COPY_QUERY_TO_STDOUT_QUERY, SELECT_HEALTH_CHECK_QUERY
 
 
 class PostgresConnectorContextManager:
@@ -80,12 +86,13 @@ class PostgresConnectorContextManager:
         """
         return self.connection
 
-    def get_data_sql(self, query: str) -> DataFrame:
+    def get_data_sql(self, query: str, params: Optional[Union[dict, tuple]] = None) -> DataFrame:
         """
         Execute a SQL query and return the results as a pandas DataFrame.
 
         Args:
             query (str): The SQL query to execute.
+            params (Optional[Union[dict, tuple]]): Parameters bound to the query placeholders. Defaults to None.
 
         Returns:
             DataFrame: A pandas DataFrame containing the query results.
@@ -94,8 +101,225 @@ class PostgresConnectorContextManager:
             Exception: If the query execution fails, an exception is raised with the error message.
         """
         try:
-            data_df = pd.read_sql(query, self.connection)
+            data_df = pd.read_sql(query, self.connection, params=params)
             return data_df
         except Exception as e:
             print(f'Failed to receive data from DB\nError: {e}\n')
             raise
+
+    def iter_data_sql(self, query: str, itersize: int = 100000,
+                      params: Optional[Union[dict, tuple]] = None) -> Iterator[DataFrame]:
+        """
+        Execute a SQL query on a named server-side cursor and yield the results in pandas DataFrame chunks.
+
+        Only one chunk of at most `itersize` rows is held on the client at a time, so large extracts do not
+        have to fit in memory the way pd.read_sql requires.
+
+        Args:
+            query (str): The SQL query to execute.
+            itersize (int): The number of rows fetched from the server per chunk. Defaults to 100000.
+            params (Optional[Union[dict, tuple]]): Parameters bound to the query placeholders. Defaults to None.
+
+        Yields:
+            DataFrame: A pandas DataFrame with the next chunk of query results. Decimal values are coerced to
+                       float, as pd.read_sql does in get_data_sql.
+
+        Raises:
+            Exception: If the query execution fails, an exception is raised with the error message.
+        """
+        cursor = self.connection.cursor(name=f'stream_{uuid4().hex}', withhold=self.connection.autocommit)
+        cursor.itersize = itersize
+        try:
+            cursor.execute(query, params)
+            while True:
+                rows = cursor.fetchmany(itersize)
+                if not rows:
+                    break
+                yield pd.DataFrame.from_records(rows, columns=[column.name for column in cursor.description],
+                                                coerce_float=True)
+        except Exception as e:
+            print(f'Failed to stream data from DB\nError: {e}\n')
+            raise
+        finally:
+            cursor.close()
+
+    def copy_data_sql(self, query: str, file: BinaryIO, params: Optional[Union[dict, tuple]] = None) -> None:
+        """
+        Execute a SQL query as COPY ... TO STDOUT and write the results to a file object as CSV with a header row.
+
+        The rows are encoded by the server, so no Python object is built per cell. NULL is written as an
+        unquoted empty field and an empty string as a quoted one.
+
+        Args:
+            query (str): The SQL query to execute. A trailing semicolon is ignored.
+            file (BinaryIO): A writable binary file object receiving the CSV stream.
+            params (Optional[Union[dict, tuple]]): Parameters bound to the query placeholders. Defaults to None.
+
+        Raises:
+            Exception: If the query execution fails, an exception is raised with the error message.
+        """
+        cursor = self.connection.cursor()
+        try:
+            if params is not None:
+                query = cursor.mogrify(query, params).decode()
+            cursor.copy_expert(COPY_QUERY_TO_STDOUT_QUERY.format(query=query.strip().rstrip(';')), file)
+        except Exception as e:
+            print(f'Failed to copy data from DB\nError: {e}\n')
+            raise
+        finally:
+            cursor.close()
+
+
+class PostgresConnectionPool:
+    """
+    PostgreSQL Connection Pool Context Manager.
+
+    This class keeps a psycopg2 ThreadedConnectionPool of connections to the configured database, so pipeline
+    stages can borrow connections concurrently without paying for a new connection and authentication each
+    time. Checkouts block while all pool_max_size connections are lent out, for up to pool_timeout seconds.
+    Every borrowed connection is health-checked first and replaced if it is broken, and rolled back when
+    returned, so no transaction leaks from one borrower to the next.
+
+    Attributes:
+        host (str): Hostname of the PostgreSQL server.
+        port (int): Port number of the PostgreSQL server.
+        db (str): Name of the database to connect to.
+        user (str): Username for authentication.
+        password (str): Password for authentication.
+        min_size (int): Number of connections opened up front, sourced from postgres_config.pool_min_size.
+        max_size (int): Maximum number of connections lent out at once, sourced from postgres_config.pool_max_size.
+        timeout (float): Seconds a checkout waits for a free connection, sourced from postgres_config.pool_timeout.
+        autocommit (bool): Whether to enable autocommit mode for borrowed connections.
+        pool (Optional[ThreadedConnectionPool]): The active connection pool.
+    """
+
+    def __init__(self, autocommit: bool = False):
+        """
+        Initialize the connection pool context manager.
+
+        Args:
+            autocommit (bool): Enable or disable autocommit mode for borrowed connections.
+                               Defaults to False.
+        """
+        self.host = postgres_config.host
+        self.port = postgres_config.port
+        self.db = postgres_config.db
+        self.user = postgres_config.user
+        self.password = postgres_config.password
+        self.min_size = postgres_config.pool_min_size
+        self.max_size = postgres_config.pool_max_size
+        self.timeout = postgres_config.pool_timeout
+        self.autocommit = autocommit
+        self.pool: Optional[ThreadedConnectionPool] = None
+        self._available = threading.BoundedSemaphore(self.max_size)
+
+    def __enter__(self):
+        """
+        Enter the context manager and open the connection pool.
+
+        Returns:
+            PostgresConnectionPool: The context manager instance with an open pool.
+        """
+        self.pool = ThreadedConnectionPool(
+            self.min_size,
+            self.max_size,
+            host=self.host,
+            port=self.port,
+            database=self.db,
+            user=self.user,
+            password=self.password
+        )
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_tb):
+        """
+        Exit the context manager and close all pooled connections.
+
+        Args:
+            exc_type (type): The type of exception raised, if any.
+            exc_value (Exception): The exception instance raised, if any.
+            exc_tb (traceback): The traceback object associated with the exception, if any.
+        """
+        if self.pool:
+            self.pool.closeall()
+
+    @staticmethod
+    def is_healthy(conn: connection) -> bool:
+        """
+        Check that a connection is open and answers a trivial query.
+
+        Args:
+            conn (connection): The connection to check.
+
+        Returns:
+            bool: True if the connection is usable.
+        """
+        if conn.closed:
+            return False
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute(SELECT_HEALTH_CHECK_QUERY)
+                cursor.fetchone()
+            conn.rollback()
+            return True
+        except psycopg2.Error:
+            return False
+
+    def get_connection(self) -> connection:
+        """
+        Borrow a healthy connection from the pool, waiting up to `timeout` seconds for a free one.
+
+        Broken connections are discarded and the next one is checked, up to one more attempt than the pool
+        size, so that after a database restart every dead pooled connection is replaced by a new one.
+
+        Returns:
+            connection: A pooled connection. Give it back with put_connection.
+
+        Raises:
+            PoolError: If no connection became free within the timeout, or no healthy connection was found.
+        """
+        if not self._available.acquire(timeout=self.timeout):
+            raise PoolError(f'No pooled connection became free within {self.timeout}s')
+        try:
+            for _ in range(self.max_size + 1):
+                conn = self.pool.getconn()
+                if self.is_healthy(conn):
+                    conn.autocommit = self.autocommit
+                    return conn
+                logging.warning('Discarding a broken pooled connection')
+                self.pool.putconn(conn, close=True)
+            raise PoolError(f'No healthy pooled connection after {self.max_size + 1} attempts')
+        except Exception:
+            self._available.release()
+            raise
+
+    def put_connection(self, conn: connection) -> None:
+        """
+        Give a borrowed connection back to the pool, rolling back any open transaction.
+
+        Args:
+            conn (connection): The connection returned by get_connection.
+        """
+        try:
+            if not conn.closed and conn.get_transaction_status() != TRANSACTION_STATUS_IDLE:
+                conn.rollback()
+            self.pool.putconn(conn, close=bool(conn.closed))
+        finally:
+            self._available.release()
+
+    @contextmanager
+    def connection(self) -> Iterator[PostgresConnectorContextManager]:
+        """
+        Borrow a connection for the duration of a `with` block.
+
+        Yields:
+            PostgresConnectorContextManager: A connector bound to the borrowed connection, providing the usual
+                                             get_connection, get_data_sql, iter_data_sql and copy_data_sql.
+        """
+        conn = self.get_connection()
+        connector = PostgresConnectorContextManager(autocommit=self.autocommit)
+        connector.connection = conn
+        try:
+            yield connector
+        finally:
+            self.put_connection(conn)
@@ -0,0 +1,168 @@
+from datetime import datetime
+
+import pyarrow as pa
+import pyarrow.compute as pc
+
+# Arrow schemas of the single-scan snapshot, in query column order
+VISITS_WITH_FACILITIES_SCHEMA = pa.schema([
+    ('patient_id', pa.int64()),
+    ('visit_timestamp', pa.timestamp('ns')),
+    ('treatment_cost', pa.decimal128(10, 2)),
+    ('duration_minutes', pa.int64()),
+    ('facility_name', pa.string()),
+    ('facility_type', pa.string())
+])
+
+PATIENT_NAMES_SCHEMA = pa.schema([
+    ('patient_id', pa.int64()),
+    ('first_name', pa.string()),
+    ('last_name', pa.string())
+])
+
+# Type treatment_cost is summed in: pyarrow 19 keeps the input precision for decimal sums, which would overflow
+SUM_TREATMENT_COST_TYPE = pa.decimal128(38, 2)
+
+# Filters of TRANSFORM_FACILITY_TYPE_AVG_TIME_SPENT_PER_VISIT_DATE_SQL
+AVG_TIME_SPENT_MIN_VISIT_TIMESTAMP = datetime(2000, 11, 1)
+AVG_TIME_SPENT_FACILITY_TYPES = ['Hospital', 'Clinic', 'Specialty Center']
+
+
+def partial_aggregates(batch):
+    """
+    Aggregates one record batch of the visits snapshot into partial results of the three transforms.
+
+    All three transforms are decomposable (sum and count, sum, min), so partial results of every batch can be
+    combined by combine_partials without holding the snapshot in memory.
+
+    Args:
+        batch (pyarrow.RecordBatch): Rows of SELECT_VISITS_WITH_FACILITIES_SQL.
+
+    Returns:
+        dict: Partial result tables keyed by 'avg_time_spent', 'sum_treatment_cost', 'min_time_spent' and
+              'clinic_min_time_spent'.
+    """
+    table = pa.Table.from_batches([batch])
+    table = table.append_column('visit_date', pc.floor_temporal(table['visit_timestamp'], unit='day'))
+    table = table.set_column(table.schema.get_field_index('treatment_cost'), 'treatment_cost',
+                             pc.cast(table['treatment_cost'], SUM_TREATMENT_COST_TYPE))
+    avg_rows = table.filter(
+        pc.and_(
+            pc.greater(table['visit_timestamp'], pa.scalar(AVG_TIME_SPENT_MIN_VISIT_TIMESTAMP, pa.timestamp('ns'))),
+            pc.is_in(table['facility_type'], value_set=pa.array(AVG_TIME_SPENT_FACILITY_TYPES))
+        )
+    )
+    clinic_rows = table.filter(pc.equal(table['facility_type'], 'Clinic'))
+    return {
+        'avg_time_spent': avg_rows.group_by(['facility_type', 'visit_date']).aggregate(
+            [('duration_minutes', 'sum'), ('duration_minutes', 'count')]
+        ),
+        'sum_treatment_cost': table.group_by(['facility_type', 'patient_id']).aggregate([('treatment_cost', 'sum')]),
+        'min_time_spent': table.group_by(['facility_name', 'visit_date']).aggregate([('duration_minutes', 'min')]),
+        'clinic_min_time_spent': clinic_rows.group_by(['facility_name', 'visit_date']).aggregate(
+            [('duration_minutes', 'min')]
+        )
+    }
+
+
+def combine_partials(partials):
+    """
+    Combines the partial results of several batches into partial results of their union.
+
+    Args:
+        partials (List[dict]): Results of partial_aggregates or combine_partials.
+
+    Returns:
+        dict: The combined partial result tables.
+    """
+    def combined(name, keys, aggregations):
+        table = pa.concat_tables([partial[name] for partial in partials])
+        return table.group_by(keys).aggregate(aggregations).rename_columns(table.column_names)
+
+    return {
+        'avg_time_spent': combined('avg_time_spent', ['facility_type', 'visit_date'],
+                                   [('duration_minutes_sum', 'sum'), ('duration_minutes_count', 'sum')]),
+        'sum_treatment_cost': combined('sum_treatment_cost', ['facility_type', 'patient_id'],
+                                       [('treatment_cost_sum', 'sum')]),
+        'min_time_spent': combined('min_time_spent', ['facility_name', 'visit_date'],
+                                   [('duration_minutes_min', 'min')]),
+        'clinic_min_time_spent': combined('clinic_min_time_spent', ['facility_name', 'visit_date'],
+                                          [('duration_minutes_min', 'min')])
+    }
+
+
+def facility_type_avg_time_spent_per_visit_date(partial):
+    """
+    Computes TRANSFORM_FACILITY_TYPE_AVG_TIME_SPENT_PER_VISIT_DATE_SQL from combined partial results.
+
+    ROUND(AVG(...), 2) is reproduced exactly: the average is rounded half away from zero on integer hundredths,
+    as Postgres rounds numeric values, before it is converted to float.
+
+    Args:
+        partial (dict): Combined partial result tables.
+
+    Returns:
+        pyarrow.Table: facility_type, visit_date and avg_time_spent.
+    """
+    table = partial['avg_time_spent']
+    total, count = table['duration_minutes_sum'], table['duration_minutes_count']
+    # round(total / count, 2) = floor((200 * total + count) / (2 * count)) / 100 for non-negative durations
+    hundredths = pc.divide(pc.add(pc.multiply(total, 200), count), pc.multiply(count, 2))
+    return pa.table({
+        'facility_type': table['facility_type'],
+        'visit_date': table['visit_date'],
+        'avg_time_spent': pc.divide(pc.cast(hundredths, pa.float64()), 100.0)
+    })
+
+
+def patient_sum_treatment_cost_per_facility_type(partial, patients):
+    """
+    Computes TRANSFORM_PATIENT_SUM_TREATMENT_COST_PER_FACILITY_TYPE_SQL from combined partial results.
+
+    The per-patient sums are joined to the patient names and summed again per name, since patients can share a
+    name and every patient with id <= 15 gets a NULL name; Clinic sums are negated as in the query.
+
+    Args:
+        partial (dict): Combined partial result tables.
+        patients (pyarrow.Table): Rows of SELECT_PATIENT_NAMES_SQL.
+
+    Returns:
+        pyarrow.Table: facility_type, full_name and sum_treatment_cost.
+    """
+    table = partial['sum_treatment_cost'].join(patients, 'patient_id', join_type='inner')
+    full_name = pc.if_else(
+        pc.less_equal(table['patient_id'], 15),
+        pa.scalar(None, pa.string()),
+        pc.binary_join_element_wise(table['first_name'], table['last_name'], ' ')
+    )
+    table = pa.table({
+        'facility_type': table['facility_type'],
+        'full_name': full_name,
+        'treatment_cost_sum': table['treatment_cost_sum']
+    }).group_by(['facility_type', 'full_name']).aggregate([('treatment_cost_sum', 'sum')])
+    total = table['treatment_cost_sum_sum']
+    total = pc.if_else(pc.equal(table['facility_type'], 'Clinic'), pc.negate(total), total)
+    return pa.table({
+        'facility_type': table['facility_type'],
+        'full_name': table['full_name'],
+        # through the decimal text, as float(Decimal) does in the other extract methods
+        'sum_treatment_cost': pc.cast(pc.cast(total, pa.string()), pa.float64())
+    })
+
+
+def facility_name_min_time_spent_per_visit_date(partial):
+    """
+    Computes TRANSFORM_FACILITY_NAME_MIN_TIME_SPENT_PER_VISIT_DATE_SQL from combined partial results, including
+    the UNION ALL of the Clinic-only branch.
+
+    Args:
+        partial (dict): Combined partial result tables.
+
+    Returns:
+        pyarrow.Table: facility_name, visit_date and min_time_spent.
+    """
+    table = pa.concat_tables([partial['min_time_spent'], partial['clinic_min_time_spent']])
+    return pa.table({
+        'facility_name': table['facility_name'],
+        'visit_date': table['visit_date'],
+        'min_time_spent': table['duration_minutes_min']
+    })
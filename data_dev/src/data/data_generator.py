@@ -1,8 +1,66 @@
 import random
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
 from faker import Faker
 from datetime import datetime, timedelta
 
-from data_dev.config import data_generator_config
+from data_dev.config import data_generator_config, faker_vocabulary_config
+from data_dev.src.data.faker_vocabulary import FakerVocabulary
+
+
+def generate_visit_columns(rng, start_day, end_day, visits_per_day, num_patients, num_facilities):
+    """
+    Generates synthetic visits for an inclusive date range column-wise with NumPy.
+
+    Args:
+        rng (np.random.Generator): The random generator to draw from.
+        start_day (np.datetime64): The first visit date (day precision).
+        end_day (np.datetime64): The last visit date (day precision).
+        visits_per_day (Tuple[int, int]): The range (min, max) of visits per day.
+        num_patients (int): Patient ids are drawn from 1..num_patients.
+        num_facilities (int): Facility ids are drawn from 1..num_facilities.
+
+    Returns:
+        pd.DataFrame: One row per visit with patient_id, facility_id, visit_timestamp, treatment_cost
+                      and duration_minutes columns.
+    """
+    days = np.arange(start_day, end_day + 1)
+    visits_per_day = rng.integers(visits_per_day[0], visits_per_day[1] + 1, size=len(days))
+    num_visits = int(visits_per_day.sum())
+    visit_days = np.repeat(days, visits_per_day).astype('datetime64[s]')
+    seconds_of_day = rng.integers(0, 24 * 60 * 60, size=num_visits).astype('timedelta64[s]')
+    return pd.DataFrame({
+        "patient_id": rng.integers(1, num_patients + 1, size=num_visits),
+        "facility_id": rng.integers(1, num_facilities + 1, size=num_visits),
+        "visit_timestamp": visit_days + seconds_of_day,
+        "treatment_cost": np.round(rng.uniform(50, 5000, size=num_visits), 2),
+        "duration_minutes": rng.integers(15, 61, size=num_visits)
+    })
+
+
+def generate_visit_shard(seed, start_day, end_day, visits_per_day, num_patients, num_facilities):
+    """
+    Generates the visits of one date shard with a random generator derived from the global seed.
+
+    The shard seed is built from the global seed and the first day of the shard, so a shard always produces
+    the same rows no matter which worker process generates it or how many workers there are.
+
+    Args:
+        seed (int): The global seed.
+        start_day (np.datetime64): The first visit date of the shard (day precision).
+        end_day (np.datetime64): The last visit date of the shard (day precision).
+        visits_per_day (Tuple[int, int]): The range (min, max) of visits per day.
+        num_patients (int): Patient ids are drawn from 1..num_patients.
+        num_facilities (int): Facility ids are drawn from 1..num_facilities.
+
+    Returns:
+        pd.DataFrame: The visits of the shard, see generate_visit_columns.
+    """
+    shard_key = start_day.astype('datetime64[D]').astype(object).toordinal()
+    rng = np.random.default_rng(np.random.SeedSequence([seed, shard_key]))
+    return generate_visit_columns(rng, start_day, end_day, visits_per_day, num_patients, num_facilities)
 
 
 class DataGenerator:
@@ -17,9 +75,15 @@ class DataGenerator:
         date_format (str): The format of the date strings, sourced from generator_config.date_format.
         visits_per_day (Tuple[int, int]): The range (min, max) of visits per day, sourced from generator_config.visits_per_day.
         facility_types (List[str]): A list of facility types, sourced from generator_config.facility_types.
+        generation_mode (str): 'python' or 'vectorized', sourced from generator_config.generation_mode.
+        batch_window_days (int): Days of visits per streamed batch, sourced from generator_config.batch_window_days.
+        num_workers (int): Worker processes used for sharded generation, sourced from generator_config.num_workers.
+        seed (int): The global seed, sourced from generator_config.seed (drawn at random when not configured).
+        rng (np.random.Generator): NumPy random generator used by the vectorized generation mode.
+        vocabulary (FakerVocabulary or None): Cached Faker value pools, set when faker_vocabulary_config.enabled.
         patients (List[dict] or None): A list of generated patient data, initialized as None.
         facilities (List[dict] or None): A list of generated facility data, initialized as None.
-        visits (List[dict] or None): A list of generated visit data, initialized as None.
+        visits (List[dict] or pd.DataFrame or None): Generated visit data, initialized as None.
     """
 
     def __init__(self):
@@ -33,24 +97,44 @@ class DataGenerator:
         self.date_format = data_generator_config.date_format
         self.visits_per_day = data_generator_config.visits_per_day
         self.facility_types = data_generator_config.facility_types
+        self.generation_mode = data_generator_config.generation_mode
+        self.batch_window_days = data_generator_config.batch_window_days
+        self.num_workers = data_generator_config.num_workers
+        self.seed = data_generator_config.seed
+        if self.seed is None:
+            self.seed = int(np.random.SeedSequence().generate_state(1)[0])
+        self.rng = np.random.default_rng(self.seed)
+        random.seed(self.seed)
+        self.fake.seed_instance(self.seed)
+        # Without a configured seed the pools are still cached under seed 0; rows are randomized by self.rng.
+        vocabulary_seed = data_generator_config.seed if data_generator_config.seed is not None else 0
+        self.vocabulary = FakerVocabulary(vocabulary_seed) if faker_vocabulary_config.enabled else None
 
         self.patients = None
         self.facilities = None
         self.visits = None
 
-    def generate_patients(self):
+    def generate_patients(self, first_id=1):
         """
         Generates a list of synthetic patient data.
 
+        When the Faker vocabulary is enabled the patients are assembled with generate_patients_frame instead.
+
+        Args:
+            first_id (int, optional): The id of the first generated patient; patients first_id..num_patients
+                                      are generated. Defaults to 1.
+
         Returns:
-            List[dict]: A list of dictionaries, each representing a patient with attributes:
+            List[dict] or pd.DataFrame: Patients, each with attributes:
                 - first_name (str): The first name of the patient.
                 - last_name (str): The last name of the patient.
                 - date_of_birth (str): The date of birth of the patient in the configured date format.
                 - address (str): The address of the patient.
         """
+        if self.vocabulary is not None:
+            return self.generate_patients_frame(first_id=first_id)
         patients = []
-        for i in range(0, self.num_patients):
+        for i in range(first_id - 1, self.num_patients):
             patients.append({
                 "patient_id": i + 1,
                 "first_name": self.fake.first_name(),
@@ -60,10 +144,60 @@ class DataGenerator:
             })
         return patients
 
+    def generate_patients_frame(self, first_id=1, count=None):
+        """
+        Assembles synthetic patients by vectorized sampling from the cached Faker vocabulary.
+
+        Dates of birth are drawn uniformly for ages 18 to 100, like Faker.date_of_birth. Every id range gets
+        its own generator derived from self.seed, so batches are reproducible independently of each other.
+
+        Args:
+            first_id (int, optional): The id of the first patient. Defaults to 1.
+            count (int, optional): The number of patients. Defaults to the remaining patients up to num_patients.
+
+        Returns:
+            pd.DataFrame: A DataFrame with patient_id, first_name, last_name, date_of_birth and address columns.
+        """
+        count = self.num_patients - first_id + 1 if count is None else count
+        rng = np.random.default_rng(np.random.SeedSequence([self.seed, 0, first_id]))
+        today = pd.Timestamp(datetime.now().date())
+        oldest = np.datetime64((today - pd.DateOffset(years=101) + pd.Timedelta(days=1)).date(), 'D')
+        youngest = np.datetime64((today - pd.DateOffset(years=18)).date(), 'D')
+        birth_offsets = rng.integers(0, (youngest - oldest).astype(int) + 1, size=count)
+        return pd.DataFrame({
+            "patient_id": np.arange(first_id, first_id + count),
+            "first_name": self.vocabulary.sample('first_name', count, rng),
+            "last_name": self.vocabulary.sample('last_name', count, rng),
+            "date_of_birth": oldest + birth_offsets.astype('timedelta64[D]'),
+            "address": self.vocabulary.sample('address', count, rng)
+        })
+
+    def iter_patient_batches(self, batch_size, first_id=1):
+        """
+        Generates patient data in batches of at most `batch_size` patients.
+
+        Only the vocabulary mode is batched; Faker-generated patients are yielded as a single batch.
+
+        Args:
+            batch_size (int): The maximum number of patients per batch.
+            first_id (int, optional): The id of the first generated patient. Defaults to 1.
+
+        Yields:
+            List[dict] or pd.DataFrame: A batch of patients.
+        """
+        if self.vocabulary is None:
+            yield self.generate_patients(first_id=first_id)
+            return
+        for first_id in range(first_id, self.num_patients + 1, batch_size):
+            yield self.generate_patients_frame(first_id=first_id,
+                                               count=min(batch_size, self.num_patients - first_id + 1))
+
     def generate_facilities(self):
         """
         Generates a list of synthetic facility data.
 
+        When the Faker vocabulary is enabled names, addresses, city and state are sampled from its pools.
+
         Returns:
             List[dict]: A list of dictionaries, each representing a facility with attributes:
                 - facility_name (str): The name of the facility.
@@ -72,6 +206,20 @@ class DataGenerator:
                 - city (str): The city where the facility is located.
                 - state (str): The state where the facility is located.
         """
+        if self.vocabulary is not None:
+            num_facilities = len(self.facility_types)
+            city = self.vocabulary.sample('city', 1, self.rng)[0]
+            state = self.vocabulary.sample('state', 1, self.rng)[0]
+            names = self.vocabulary.sample('company', num_facilities, self.rng)
+            addresses = self.vocabulary.sample('address', num_facilities, self.rng)
+            return [{
+                "facility_id": i + 1,
+                "facility_name": names[i],
+                "facility_type": self.facility_types[i],
+                "address": addresses[i],
+                "city": city,
+                "state": state
+            } for i in range(num_facilities)]
         city = self.fake.city()
         state = self.fake.state()
         facilities = []
@@ -86,10 +234,14 @@ class DataGenerator:
             })
         return facilities
 
-    def generate_visits(self):
+    def generate_visits(self, start_date=None, end_date=None):
         """
         Generates a list of synthetic visit data.
 
+        Args:
+            start_date (str, optional): First visit date in the configured date format. Defaults to self.start_date.
+            end_date (str, optional): Last visit date in the configured date format. Defaults to self.end_date.
+
         Returns:
             List[dict]: A list of dictionaries, each representing a visit with attributes:
                 - patient_id (int): The ID of the patient (randomly assigned).
@@ -99,10 +251,12 @@ class DataGenerator:
                 - treatment_cost (float): The cost of the treatment (randomly generated).
                 - duration_minutes (int): The duration of the visit in minutes (randomly generated).
         """
+        start_date = start_date or self.start_date
+        end_date = end_date or self.end_date
         visits = []
-        date_list = [(datetime.strptime(self.end_date, self.date_format) - timedelta(days=i)) for i in
-                     range((datetime.strptime(self.end_date, self.date_format)
-                            - datetime.strptime(self.start_date, self.date_format)).days + 1)]
+        date_list = [(datetime.strptime(end_date, self.date_format) - timedelta(days=i)) for i in
+                     range((datetime.strptime(end_date, self.date_format)
+                            - datetime.strptime(start_date, self.date_format)).days + 1)]
         for date in date_list:
             num_visits_per_day = random.randint(self.visits_per_day[0], self.visits_per_day[1])
             for _ in range(num_visits_per_day):
@@ -126,20 +280,106 @@ class DataGenerator:
                 })
         return visits
 
+    def generate_visits_frame(self, start_date=None, end_date=None):
+        """
+        Generates synthetic visit data column-wise with NumPy.
+
+        Draws from the same distributions as generate_visits (visits per day, uniform time of day, patient and
+        facility ids, treatment cost and duration ranges), but the whole date range is generated at once.
+
+        Args:
+            start_date (str, optional): First visit date in the configured date format. Defaults to self.start_date.
+            end_date (str, optional): Last visit date in the configured date format. Defaults to self.end_date.
+
+        Returns:
+            pd.DataFrame: A DataFrame with one row per visit and columns:
+                - patient_id (int64): The ID of the patient (randomly assigned).
+                - facility_id (int64): The ID of the facility (randomly assigned).
+                - visit_timestamp (datetime64[s]): The timestamp of the visit.
+                - treatment_cost (float64): The cost of the treatment, rounded to 2 decimals.
+                - duration_minutes (int64): The duration of the visit in minutes.
+        """
+        start = np.datetime64(datetime.strptime(start_date or self.start_date, self.date_format).date(), 'D')
+        end = np.datetime64(datetime.strptime(end_date or self.end_date, self.date_format).date(), 'D')
+        return generate_visit_columns(self.rng, start, end, self.visits_per_day,
+                                      self.num_patients, len(self.facility_types))
+
+    def iter_date_windows(self, window_days=None):
+        """
+        Splits the start_date..end_date range into consecutive date windows.
+
+        Args:
+            window_days (int, optional): Number of days per window. Defaults to self.batch_window_days.
+
+        Yields:
+            Tuple[str, str]: The first and last date of each window in the configured date format.
+        """
+        window_days = window_days or self.batch_window_days
+        window_start = datetime.strptime(self.start_date, self.date_format)
+        end = datetime.strptime(self.end_date, self.date_format)
+        while window_start <= end:
+            window_end = min(window_start + timedelta(days=window_days - 1), end)
+            yield window_start.strftime(self.date_format), window_end.strftime(self.date_format)
+            window_start = window_end + timedelta(days=1)
+
+    def iter_visit_batches(self, window_days=None):
+        """
+        Generates visit data one date window at a time, so only one batch is held in memory.
+
+        In vectorized mode every window is a shard with its own seed derived from self.seed, and the shards
+        are generated in a process pool when num_workers > 1. The batches are yielded in date order and are
+        identical for any number of workers. At most 2 * num_workers shards are in flight at a time.
+
+        Args:
+            window_days (int, optional): Number of days per batch. Defaults to self.batch_window_days.
+
+        Yields:
+            List[dict] or pd.DataFrame: The visits of one date window, in the format of the generation mode.
+        """
+        if self.generation_mode != 'vectorized':
+            for window_start, window_end in self.iter_date_windows(window_days):
+                yield self.generate_visits(start_date=window_start, end_date=window_end)
+            return
+
+        shards = [(self.seed,
+                   np.datetime64(datetime.strptime(window_start, self.date_format).date(), 'D'),
+                   np.datetime64(datetime.strptime(window_end, self.date_format).date(), 'D'),
+                   self.visits_per_day, self.num_patients, len(self.facility_types))
+                  for window_start, window_end in self.iter_date_windows(window_days)]
+        if self.num_workers <= 1:
+            for shard in shards:
+                yield generate_visit_shard(*shard)
+            return
+
+        with ProcessPoolExecutor(max_workers=self.num_workers) as executor:
+            pending = deque()
+            for shard in shards:
+                pending.append(executor.submit(generate_visit_shard, *shard))
+                if len(pending) >= 2 * self.num_workers:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+
     def generate_data(self):
         """
         Generates synthetic data for patients, facilities, and visits, and stores them in the class attributes.
+
+        In vectorized mode the visits are the concatenated seeded shards of iter_visit_batches, so the result
+        is the same for any num_workers.
         """
         self.patients = self.generate_patients()
         self.facilities = self.generate_facilities()
-        self.visits = self.generate_visits()
+        if self.generation_mode == 'vectorized':
+            self.visits = pd.concat(self.iter_visit_batches(), ignore_index=True)
+        else:
+            self.visits = self.generate_visits()
 
     def get_visits(self):
         """
         Retrieves the generated visit data.
 
         Returns:
-            List[dict]: A list of visit data dictionaries.
+            List[dict] or pd.DataFrame: A list of visit data dictionaries, or a DataFrame in vectorized mode.
         """
         return self.visits
 
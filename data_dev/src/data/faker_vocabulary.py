@@ -0,0 +1,102 @@
+import os
+import logging
+
+import pandas as pd
+from faker import Faker
+
+from data_dev.config import faker_vocabulary_config
+
+
+class FakerVocabulary:
+    """
+    A class to build, cache and serve pools of Faker values for vectorized sampling.
+
+    Faker is slow per call, so instead of calling it once per generated row the vocabulary samples a fixed
+    pool of first names, last names, addresses, company names, cities and states once, stores the pools on
+    disk as a Parquet file keyed by locale, seed and pool size, and reuses them on the next run.
+
+    Attributes:
+        locale (str): The Faker locale, sourced from faker_vocabulary_config.locale.
+        pool_size (int): The number of values sampled per pool, sourced from faker_vocabulary_config.pool_size.
+        cache_dir (str): The directory holding cached pools, sourced from faker_vocabulary_config.cache_dir.
+        seed (int): The seed the pools are sampled with.
+        pools (dict or None): A dictionary of pool name -> numpy array of values, initialized as None.
+
+    Methods:
+        - cache_path(): Returns the path of the cache file for this locale, seed and pool size.
+        - build_pools(): Samples all pools from Faker.
+        - load(): Returns the pools, reading them from the cache or building and caching them.
+        - sample(name, size, rng): Draws `size` values from a pool.
+    """
+
+    POOL_NAMES = ('first_name', 'last_name', 'address', 'company', 'city', 'state')
+
+    def __init__(self, seed):
+        """
+        Initializes the FakerVocabulary with configuration values.
+
+        Args:
+            seed (int): The seed the pools are sampled with.
+        """
+        self.locale = faker_vocabulary_config.locale
+        self.pool_size = faker_vocabulary_config.pool_size
+        self.cache_dir = faker_vocabulary_config.cache_dir
+        self.seed = seed
+        self.pools = None
+
+    def cache_path(self):
+        """
+        Returns the path of the cache file for this locale, seed and pool size.
+
+        Returns:
+            str: The path of the Parquet cache file.
+        """
+        return os.path.join(self.cache_dir, f"vocabulary_{self.locale}_{self.seed}_{self.pool_size}.parquet")
+
+    def build_pools(self):
+        """
+        Samples all pools from Faker.
+
+        Returns:
+            pd.DataFrame: A DataFrame with one column per pool and pool_size rows.
+        """
+        fake = Faker(self.locale)
+        fake.seed_instance(self.seed)
+        return pd.DataFrame({
+            name: [getattr(fake, name)() for _ in range(self.pool_size)] for name in self.POOL_NAMES
+        })
+
+    def load(self):
+        """
+        Returns the pools, reading them from the cache or building and caching them on a cache miss.
+
+        Returns:
+            dict: A dictionary of pool name -> numpy array of values.
+        """
+        if self.pools is None:
+            path = self.cache_path()
+            if os.path.exists(path):
+                pools_df = pd.read_parquet(path)
+            else:
+                logging.info(f"Building Faker vocabulary ({self.locale}, seed={self.seed}, size={self.pool_size})...")
+                pools_df = self.build_pools()
+                os.makedirs(self.cache_dir, exist_ok=True)
+                pools_df.to_parquet(f"{path}.tmp", engine='pyarrow', index=False)
+                os.replace(f"{path}.tmp", path)
+            self.pools = {name: pools_df[name].to_numpy(dtype=object) for name in self.POOL_NAMES}
+        return self.pools
+
+    def sample(self, name, size, rng):
+        """
+        Draws `size` values from a pool with replacement.
+
+        Args:
+            name (str): The pool name, one of POOL_NAMES.
+            size (int): The number of values to draw.
+            rng (np.random.Generator): The random generator to draw with.
+
+        Returns:
+            np.ndarray: An object array of sampled values.
+        """
+        pool = self.load()[name]
+        return pool[rng.integers(0, len(pool), size=size)]
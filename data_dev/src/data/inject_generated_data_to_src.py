@@ -1,13 +1,41 @@
+import csv
+import io
+import logging
+import time
+from datetime import datetime, timedelta
+
+import pandas as pd
+import psycopg2
+from psycopg2.extras import execute_values
+
 from data_dev.src.data.data_generator import DataGenerator
+from data_dev.config import src_injection_config
 from data_dev.queries import (
     CREATE_SRC_GENERATED_FACILITIES_TABLE_QUERY,
     CREATE_SRC_GENERATED_PATIENTS_TABLE_QUERY,
     CREATE_SRC_GENERATED_VISITS_TABLE_QUERY,
     INSERT_SRC_GENERATED_FACILITIES_QUERY,
     INSERT_SRC_GENERATED_PATIENTS_QUERY,
-    INSERT_SRC_GENERATED_VISITS_QUERY
+    INSERT_SRC_GENERATED_VISITS_QUERY,
+    COPY_SRC_GENERATED_FACILITIES_QUERY,
+    COPY_SRC_GENERATED_PATIENTS_QUERY,
+    COPY_SRC_GENERATED_VISITS_QUERY,
+    INSERT_SRC_GENERATED_FACILITIES_VALUES_QUERY,
+    INSERT_SRC_GENERATED_PATIENTS_VALUES_QUERY,
+    INSERT_SRC_GENERATED_VISITS_VALUES_QUERY,
+    SELECT_SRC_GENERATED_HIGH_WATER_MARKS_QUERY,
+    CREATE_SRC_GENERATED_VISITS_TIMESTAMP_INDEX_QUERY,
+    CREATE_SRC_STAGING_SCHEMA_QUERY,
+    CREATE_SRC_STAGING_TABLE_QUERY,
+    ANALYZE_SRC_STAGING_TABLE_QUERY,
+    SWAP_SRC_STAGING_TABLE_QUERY
 )
 
+SRC_GENERATED_FACILITIES_COLUMNS = ('facility_id', 'facility_name', 'facility_type', 'address', 'city', 'state')
+SRC_GENERATED_PATIENTS_COLUMNS = ('patient_id', 'first_name', 'last_name', 'date_of_birth', 'address')
+SRC_GENERATED_VISITS_COLUMNS = ('patient_id', 'facility_id', 'visit_timestamp', 'treatment_cost', 'duration_minutes')
+SRC_GENERATED_TABLES = ('src_generated_facilities', 'src_generated_patients', 'src_generated_visits')
+
 
 class GeneratedDataLoader:
     """
@@ -16,10 +44,26 @@ class GeneratedDataLoader:
     Attributes:
         conn (object): A database connection object.
         dg (DataGenerator): An instance of the DataGenerator class for generating synthetic data.
+        load_method (str): How rows are written: 'copy', 'values' or 'row', sourced from
+                           src_injection_config.load_method.
+        batch_size (int): Rows per COPY chunk or execute_values page, sourced from src_injection_config.batch_size.
+        stream_visits (bool): Whether visits are generated and loaded per date window, sourced from
+                              src_injection_config.stream_visits.
+        mode (str): 'initial', 'append' or 'swap', sourced from src_injection_config.mode.
+        append_num_patients (int): New patients per append run, sourced from src_injection_config.append_num_patients.
 
     Methods:
         - is_table_empty(cursor, table_name): Checks if a given table is empty.
+        - to_records(data): Converts generated data to a list of dictionaries.
         - inject_data_into_table(cursor, data, query): Inserts data into a table using a specified query.
+        - copy_data_into_table(cursor, data, query, columns, batch_size): Streams data into a table using COPY.
+        - insert_values_into_table(cursor, data, query, columns, batch_size): Inserts data using execute_values.
+        - bulk_inject_data_into_table(cursor, data, table_name, ...): Loads data with the configured load method.
+        - inject_facilities / inject_patients / inject_visits(cursor, data): Load one generated dataset.
+        - inject_visits_streaming(cursor): Generates and loads visits one date window at a time.
+        - inject_initial_data(cursor): Generates and loads the full date range into empty src tables.
+        - append_data(cursor): Generates and loads only the days after the latest loaded visit.
+        - swap_in_staging_data(cursor): Regenerates all data into UNLOGGED staging tables and swaps them in.
         - inject_data(): Creates tables (if not exist) and injects generated data into the database.
     """
 
@@ -32,6 +76,11 @@ class GeneratedDataLoader:
         """
         self.conn = conn
         self.dg = DataGenerator()
+        self.load_method = src_injection_config.load_method
+        self.batch_size = src_injection_config.batch_size
+        self.stream_visits = src_injection_config.stream_visits
+        self.mode = src_injection_config.mode
+        self.append_num_patients = src_injection_config.append_num_patients
 
     @staticmethod
     def is_table_empty(cursor, table_name):
@@ -45,9 +94,9 @@ class GeneratedDataLoader:
         Returns:
             bool: True if the table is empty, False otherwise.
         """
-        query = f"SELECT COUNT(*) FROM {table_name}"
+        query = f"SELECT NOT EXISTS (SELECT 1 FROM {table_name})"
         cursor.execute(query)
-        return cursor.fetchone()[0] == 0
+        return cursor.fetchone()[0]
 
     @staticmethod
     def inject_data_into_table(cursor, data, query):
@@ -62,17 +111,259 @@ class GeneratedDataLoader:
         for params in data:
             cursor.execute(query, params)
 
+    @staticmethod
+    def to_records(data):
+        """
+        Converts generated data to a list of dictionaries.
+
+        Args:
+            data (list or pd.DataFrame): Generated data as a list of dictionaries or a DataFrame.
+
+        Returns:
+            list: A list of dictionaries, one per row.
+        """
+        if isinstance(data, pd.DataFrame):
+            return data.to_dict('records')
+        return data
+
+    @staticmethod
+    def copy_data_into_table(cursor, data, query, columns, batch_size):
+        """
+        Streams data into a table through COPY ... FROM STDIN, one CSV chunk of `batch_size` rows at a time.
+
+        Args:
+            cursor (object): A database cursor object.
+            data (list or pd.DataFrame): A list of dictionaries or a DataFrame to be inserted.
+            query (str): The COPY ... FROM STDIN statement for the target table.
+            columns (tuple): Column names in the order expected by the COPY statement.
+            batch_size (int): The number of rows sent per COPY command.
+        """
+        for start in range(0, len(data), batch_size):
+            buffer = io.StringIO()
+            if isinstance(data, pd.DataFrame):
+                data.iloc[start:start + batch_size].to_csv(buffer, columns=list(columns), header=False, index=False)
+            else:
+                writer = csv.writer(buffer)
+                for row in data[start:start + batch_size]:
+                    writer.writerow([row[column] for column in columns])
+            buffer.seek(0)
+            cursor.copy_expert(query, buffer)
+
+    def insert_values_into_table(self, cursor, data, query, columns, batch_size):
+        """
+        Inserts data into a table with multi-row INSERT statements built by execute_values.
+
+        Args:
+            cursor (object): A database cursor object.
+            data (list or pd.DataFrame): A list of dictionaries or a DataFrame to be inserted.
+            query (str): The INSERT ... VALUES %s statement for the target table.
+            columns (tuple): Column names in the order expected by the INSERT statement.
+            batch_size (int): The number of rows sent per INSERT statement.
+        """
+        template = '(' + ', '.join(f'%({column})s' for column in columns) + ')'
+        execute_values(cursor, query, self.to_records(data), template=template, page_size=batch_size)
+
+    def bulk_inject_data_into_table(self, cursor, data, table_name, columns, copy_query, values_query, insert_query):
+        """
+        Loads data into a table using the configured load method and logs the achieved throughput.
+
+        With load_method 'copy' the rows are streamed through COPY; if COPY fails (e.g. behind a proxy
+        that does not support it) the load is rolled back to a savepoint and retried with execute_values.
+
+        Args:
+            cursor (object): A database cursor object.
+            data (list or pd.DataFrame): A list of dictionaries or a DataFrame to be inserted.
+            table_name (str): The name of the target table (used for logging and the savepoint).
+            columns (tuple): Column names of the target table in load order.
+            copy_query (str): The COPY ... FROM STDIN statement for the target table.
+            values_query (str): The INSERT ... VALUES %s statement for the target table.
+            insert_query (str): The single-row INSERT statement for the target table.
+        """
+        start_time = time.perf_counter()
+        method = self.load_method
+        if method == 'copy':
+            cursor.execute('SAVEPOINT bulk_load')
+            try:
+                self.copy_data_into_table(cursor, data, copy_query, columns, self.batch_size)
+                cursor.execute('RELEASE SAVEPOINT bulk_load')
+            except psycopg2.Error as e:
+                logging.warning(f"COPY into {table_name} failed, falling back to batched inserts: {e}")
+                cursor.execute('ROLLBACK TO SAVEPOINT bulk_load')
+                method = 'values'
+        if method == 'values':
+            self.insert_values_into_table(cursor, data, values_query, columns, self.batch_size)
+        elif method == 'row':
+            self.inject_data_into_table(cursor, self.to_records(data), insert_query)
+        elapsed = time.perf_counter() - start_time
+        rows_per_second = len(data) / elapsed if elapsed > 0 else float('inf')
+        logging.info(f"Loaded {len(data)} rows into {table_name} via {method} "
+                     f"in {elapsed:.2f}s ({rows_per_second:,.0f} rows/s)")
+
+    def inject_facilities(self, cursor, data):
+        """
+        Loads generated facility data into `src_generated_facilities`.
+
+        Args:
+            cursor (object): A database cursor object.
+            data (list): A list of facility dictionaries.
+        """
+        self.bulk_inject_data_into_table(
+            cursor=cursor,
+            data=data,
+            table_name='src_generated_facilities',
+            columns=SRC_GENERATED_FACILITIES_COLUMNS,
+            copy_query=COPY_SRC_GENERATED_FACILITIES_QUERY,
+            values_query=INSERT_SRC_GENERATED_FACILITIES_VALUES_QUERY,
+            insert_query=INSERT_SRC_GENERATED_FACILITIES_QUERY
+        )
+
+    def inject_patients(self, cursor, data):
+        """
+        Loads generated patient data into `src_generated_patients`.
+
+        Args:
+            cursor (object): A database cursor object.
+            data (list or pd.DataFrame): A list of patient dictionaries or a DataFrame of patients.
+        """
+        self.bulk_inject_data_into_table(
+            cursor=cursor,
+            data=data,
+            table_name='src_generated_patients',
+            columns=SRC_GENERATED_PATIENTS_COLUMNS,
+            copy_query=COPY_SRC_GENERATED_PATIENTS_QUERY,
+            values_query=INSERT_SRC_GENERATED_PATIENTS_VALUES_QUERY,
+            insert_query=INSERT_SRC_GENERATED_PATIENTS_QUERY
+        )
+
+    def inject_visits(self, cursor, data):
+        """
+        Loads generated visit data into `src_generated_visits`.
+
+        Args:
+            cursor (object): A database cursor object.
+            data (list or pd.DataFrame): A list of visit dictionaries or a DataFrame of visits.
+        """
+        self.bulk_inject_data_into_table(
+            cursor=cursor,
+            data=data,
+            table_name='src_generated_visits',
+            columns=SRC_GENERATED_VISITS_COLUMNS,
+            copy_query=COPY_SRC_GENERATED_VISITS_QUERY,
+            values_query=INSERT_SRC_GENERATED_VISITS_VALUES_QUERY,
+            insert_query=INSERT_SRC_GENERATED_VISITS_QUERY
+        )
+
+    def inject_visits_streaming(self, cursor):
+        """
+        Generates visits one date window at a time and loads each batch before generating the next one.
+
+        Only a single batch of visits is held in memory, so peak memory does not depend on the length
+        of the start_date..end_date range.
+
+        Args:
+            cursor (object): A database cursor object.
+        """
+        total_rows = 0
+        for batch in self.dg.iter_visit_batches():
+            self.inject_visits(cursor=cursor, data=batch)
+            total_rows += len(batch)
+        logging.info(f"Streamed {total_rows} visits into src_generated_visits")
+
+    def inject_initial_data(self, cursor):
+        """
+        Generates synthetic facilities, patients and visits for the full date range and loads them.
+
+        With stream_visits enabled patients and visits are generated and loaded batch by batch.
+
+        Args:
+            cursor (object): A database cursor object.
+        """
+        if self.stream_visits:
+            self.inject_facilities(cursor=cursor, data=self.dg.generate_facilities())
+            for batch in self.dg.iter_patient_batches(batch_size=self.batch_size):
+                self.inject_patients(cursor=cursor, data=batch)
+            self.inject_visits_streaming(cursor=cursor)
+        else:
+            self.dg.generate_data()
+            self.inject_facilities(cursor=cursor, data=self.dg.get_facilities())
+            self.inject_patients(cursor=cursor, data=self.dg.get_patients())
+            self.inject_visits(cursor=cursor, data=self.dg.get_visits())
+
+    def append_data(self, cursor):
+        """
+        Extends the src tables with the days after the latest loaded visit.
+
+        Reads the max `visit_timestamp` and the patient and facility id high-water marks, adds
+        `append_num_patients` new patients after the patient high-water mark, and generates visits from the
+        day after the latest visit up to the generator end_date for patients and facilities that already
+        exist (or were just added).
+
+        Args:
+            cursor (object): A database cursor object.
+        """
+        cursor.execute(SELECT_SRC_GENERATED_HIGH_WATER_MARKS_QUERY)
+        max_visit_timestamp, max_patient_id, max_facility_id = cursor.fetchone()
+        start_date = max_visit_timestamp.date() + timedelta(days=1)
+        end_date = self.dg.end_date
+        if start_date > datetime.strptime(end_date, self.dg.date_format).date():
+            logging.info(f"src_generated_visits is already loaded up to {max_visit_timestamp}, nothing to append")
+            return
+
+        self.dg.start_date = start_date.strftime(self.dg.date_format)
+        self.dg.num_patients = max_patient_id + self.append_num_patients
+        # Visits only reference facilities that are already loaded
+        self.dg.facility_types = self.dg.facility_types[:max_facility_id]
+        if self.append_num_patients > 0:
+            for batch in self.dg.iter_patient_batches(batch_size=self.batch_size, first_id=max_patient_id + 1):
+                self.inject_patients(cursor=cursor, data=batch)
+        logging.info(f"Appending visits from {self.dg.start_date} to {end_date}")
+        self.inject_visits_streaming(cursor=cursor)
+
+    def swap_in_staging_data(self, cursor):
+        """
+        Regenerates the full date range into UNLOGGED staging tables and swaps them in place of the src tables.
+
+        The staging tables live in the `src_staging` schema under the src table names, so the regular load
+        queries are reused by putting that schema first on the search_path. UNLOGGED tables skip WAL during
+        the bulk load, and the `visit_timestamp` index is built once after the load. The swap drops the
+        src tables and moves the staging tables into `public` in the caller's transaction, so readers such as
+        NF3Loader see either the previous or the new complete data, never a partial load.
+
+        The swapped-in src tables stay UNLOGGED: they are regenerable staging data and are emptied after a
+        database crash, in which case the next run regenerates them.
+
+        Args:
+            cursor (object): A database cursor object.
+        """
+        cursor.execute(CREATE_SRC_STAGING_SCHEMA_QUERY)
+        for table_name in SRC_GENERATED_TABLES:
+            cursor.execute(CREATE_SRC_STAGING_TABLE_QUERY.format(table_name=table_name))
+
+        cursor.execute('SET LOCAL search_path TO src_staging, public')
+        self.inject_initial_data(cursor=cursor)
+        cursor.execute(CREATE_SRC_GENERATED_VISITS_TIMESTAMP_INDEX_QUERY)
+        cursor.execute('SET LOCAL search_path TO DEFAULT')
+
+        for table_name in SRC_GENERATED_TABLES:
+            cursor.execute(ANALYZE_SRC_STAGING_TABLE_QUERY.format(table_name=table_name))
+            cursor.execute(SWAP_SRC_STAGING_TABLE_QUERY.format(table_name=table_name))
+        logging.info("Swapped staging tables in as src tables")
+
     def inject_data(self):
         """
         Creates tables (if they don't exist) and injects generated data into the database.
 
         This method:
-        1. Creates the `src_generated_facilities`, `src_generated_patients`, and 
+        1. Creates the `src_generated_facilities`, `src_generated_patients`, and
            `src_generated_visits` tables if they do not already exist.
         2. Checks if the `src_generated_visits` table is empty.
         3. If the table is empty, generates synthetic data for facilities, patients, and visits.
-        4. Inserts the generated data into the respective tables.
-        5. Commits the transaction if successful, or rolls back in case of an error.
+           With stream_visits enabled visits are generated and loaded one date window at a time.
+           If the table is not empty and mode is 'append', generates and loads only the new days.
+           If mode is 'swap', regenerates all data into UNLOGGED staging tables and swaps them in.
+        4. Loads the generated data into the respective tables using the configured load method.
+        5. Creates the `visit_timestamp` index of `src_generated_visits` if it does not exist.
+        6. Commits the transaction if successful, or rolls back in case of an error.
         """
         cursor = self.conn.cursor()
         try:
@@ -81,25 +372,18 @@ class GeneratedDataLoader:
             cursor.execute(CREATE_SRC_GENERATED_PATIENTS_TABLE_QUERY)
             cursor.execute(CREATE_SRC_GENERATED_VISITS_TABLE_QUERY)
 
-            # Generate and insert data if the visits table is empty
-            if self.is_table_empty(cursor=cursor, table_name='src_generated_visits'):
-                self.dg.generate_data()
-                self.inject_data_into_table(
-                    cursor=cursor,
-                    data=self.dg.get_facilities(),
-                    query=INSERT_SRC_GENERATED_FACILITIES_QUERY
-                )
-                self.inject_data_into_table(
-                    cursor=cursor,
-                    data=self.dg.get_patients(),
-                    query=INSERT_SRC_GENERATED_PATIENTS_QUERY
-                )
-                self.inject_data_into_table(
-                    cursor=cursor,
-                    data=self.dg.get_visits(),
-                    query=INSERT_SRC_GENERATED_VISITS_QUERY
-                )
-                self.conn.commit()
+            # Regenerate through staging tables, generate and insert data if the visits table is empty,
+            # otherwise append new days if requested
+            if self.mode == 'swap':
+                self.swap_in_staging_data(cursor=cursor)
+            elif self.is_table_empty(cursor=cursor, table_name='src_generated_visits'):
+                self.inject_initial_data(cursor=cursor)
+            elif self.mode == 'append':
+                self.append_data(cursor=cursor)
+
+            # Index the visit timestamps after the load, the 3NF merge reads src visits by timestamp range
+            cursor.execute(CREATE_SRC_GENERATED_VISITS_TIMESTAMP_INDEX_QUERY)
+            self.conn.commit()
         except Exception as e:
             # Rollback the transaction in case of an error
             self.conn.rollback()
@@ -1,9 +1,29 @@
+import logging
+from datetime import datetime, timedelta
+
+import psycopg2
+
 from data_dev.queries import (CREATE_FACILITIES_TABLE_QUERY,
                               CREATE_PATIENTS_TABLE_QUERY,
                               CREATE_VISITS_TABLE_QUERY)
+from data_dev.queries import (CREATE_VISITS_PARTITIONED_TABLE_QUERY,
+                              CREATE_VISITS_PARTITION_QUERY,
+                              SELECT_VISITS_RELKIND_QUERY,
+                              SELECT_SRC_GENERATED_VISITS_MIN_TIMESTAMP_QUERY)
+from data_dev.queries import (CREATE_FACILITIES_EXTERNAL_ID_INDEX_QUERY,
+                              CREATE_PATIENTS_EXTERNAL_ID_INDEX_QUERY,
+                              CREATE_VISITS_MERGE_KEY_INDEX_QUERY,
+                              CREATE_VISITS_VISIT_DATE_INDEX_QUERY)
 from data_dev.queries import (MERGE_PATIENTS_QUERY,
                               MERGE_VISITS_QUERY,
                               MERGE_FACILITIES_QUERY)
+from data_dev.queries import (INSERT_ON_CONFLICT_FACILITIES_QUERY,
+                              INSERT_ON_CONFLICT_PATIENTS_QUERY,
+                              INSERT_ON_CONFLICT_VISITS_QUERY)
+from data_dev.queries import (CREATE_LOAD_WATERMARK_TABLE_QUERY,
+                              SELECT_LOAD_WATERMARK_QUERY,
+                              SELECT_SRC_VISITS_WATERMARK_QUERY,
+                              UPSERT_LOAD_WATERMARK_QUERY)
 from data_dev.config import load_config
 
 
@@ -13,10 +33,30 @@ class NF3Loader:
 
     This class is responsible for:
     1. Creating the necessary database tables if they do not already exist.
-    2. Merging data into the 3NF tables using predefined SQL queries.
+    2. Creating the unique indexes the merges look up rows by, and the visit date index of `visits`.
+    3. Merging data into the 3NF tables using predefined SQL queries.
+    4. Tracking a load watermark for `visits`, so every run merges only the src visits after the latest one
+       merged by the previous run.
+    5. Optionally creating `visits` range-partitioned by month and creating the monthly partitions the merge
+       writes to, plus partition_months_ahead future months, before every merge.
+
+    The watermark is the exclusive upper bound of the merged source range and advances in the merge transaction,
+    to just past the latest merged src visit, or to the end of date_scope if src reaches it. Visits appended
+    later for dates between the two, as the append mode does when end_date is before date_scope, are merged by
+    the next run.
+    After src data has been regenerated for dates before the watermark, delete the `visits` row from
+    `nf3_load_watermark` (or disable use_watermark) to merge the full history again.
 
     Attributes:
         conn: A psycopg2 database connection object used to interact with the database.
+        merge_strategy (str): 'merge' or 'on_conflict', sourced from load_config.merge_strategy.
+        manage_indexes (bool): Whether the loader creates its indexes, sourced from load_config.manage_indexes.
+        use_watermark (bool): Whether visits are merged from the stored watermark, sourced from
+                              load_config.use_watermark.
+        partition_visits (bool): Whether `visits` is range-partitioned by month, sourced from
+                                 load_config.partition_visits.
+        partition_months_ahead (int): Future monthly partitions to create, sourced from
+                                      load_config.partition_months_ahead.
     """
 
     def __init__(self, conn):
@@ -27,6 +67,144 @@ class NF3Loader:
             conn: A psycopg2 database connection object.
         """
         self.conn = conn
+        self.merge_strategy = load_config.merge_strategy
+        self.manage_indexes = load_config.manage_indexes
+        self.use_watermark = load_config.use_watermark
+        self.partition_visits = load_config.partition_visits
+        self.partition_months_ahead = load_config.partition_months_ahead
+
+    @staticmethod
+    def create_indexes(cursor):
+        """
+        Create the unique indexes on `facilities.external_id`, `patients.external_id` and on the
+        (facility_id, patient_id, visit_timestamp) merge key of `visits`, and the index on the visit date of
+        `visits`, if they do not exist.
+
+        The unique indexes let the merges use index lookups instead of scanning the 3NF tables, and are the
+        conflict targets of the 'on_conflict' merge strategy. If existing rows violate a key the index is
+        skipped with a warning, so the 'merge' strategy keeps working on such tables. The visit date index
+        lets the incremental parquet export read only the months it refreshes.
+
+        Args:
+            cursor: A psycopg2 cursor object.
+        """
+        for query in (CREATE_FACILITIES_EXTERNAL_ID_INDEX_QUERY,
+                      CREATE_PATIENTS_EXTERNAL_ID_INDEX_QUERY,
+                      CREATE_VISITS_MERGE_KEY_INDEX_QUERY,
+                      CREATE_VISITS_VISIT_DATE_INDEX_QUERY):
+            cursor.execute('SAVEPOINT create_index')
+            try:
+                cursor.execute(query)
+                cursor.execute('RELEASE SAVEPOINT create_index')
+            except psycopg2.errors.UniqueViolation as e:
+                cursor.execute('ROLLBACK TO SAVEPOINT create_index')
+                logging.warning(f"Unique index skipped, existing rows contain duplicate keys: {e}")
+
+    def get_visits_range(self, cursor):
+        """
+        Get the src visit timestamp range to merge in this run.
+
+        The lower bound is the stored watermark (locked until the transaction ends), or '-infinity' on the first
+        run or when use_watermark is disabled. The upper bound is the start of the day after date_scope.
+
+        Args:
+            cursor: A psycopg2 cursor object.
+
+        Returns:
+            dict: Query parameters with the inclusive `lower_bound` and exclusive `upper_bound` timestamps.
+        """
+        lower_bound = '-infinity'
+        if self.use_watermark:
+            cursor.execute(SELECT_LOAD_WATERMARK_QUERY, {'table_name': 'visits'})
+            row = cursor.fetchone()
+            if row is not None:
+                lower_bound = row[0]
+        upper_bound = datetime.strptime(load_config.date_scope, '%Y-%m-%d') + timedelta(days=1)
+        return {'lower_bound': lower_bound, 'upper_bound': upper_bound}
+
+    @staticmethod
+    def get_visits_watermark(cursor, visits_range):
+        """
+        Get the watermark to advance to after merging a src visit timestamp range.
+
+        Args:
+            cursor: A psycopg2 cursor object.
+            visits_range (dict): The `lower_bound` and `upper_bound` of the merged range.
+
+        Returns:
+            datetime or None: One microsecond past the latest src visit in the range, capped at its upper bound,
+                              or None if the range holds no src visits.
+        """
+        cursor.execute(SELECT_SRC_VISITS_WATERMARK_QUERY, visits_range)
+        return cursor.fetchone()[0]
+
+    @staticmethod
+    def add_months(month_start, months):
+        """
+        Shift the first day of a month by a number of months.
+
+        Args:
+            month_start (datetime): The first day of a month.
+            months (int): The number of months to add.
+
+        Returns:
+            datetime: The first day of the shifted month.
+        """
+        month_index = month_start.year * 12 + month_start.month - 1 + months
+        return datetime(month_index // 12, month_index % 12 + 1, 1)
+
+    def create_visits_partitions(self, cursor, visits_range):
+        """
+        Create the monthly `visits` partitions for the src visits merged in this run and for
+        partition_months_ahead months after date_scope.
+
+        Partitions are named visits_YYYY_MM and cover [first day of the month, first day of the next month).
+        Nothing is created if `visits` exists as a regular (non-partitioned) table.
+
+        Args:
+            cursor: A psycopg2 cursor object.
+            visits_range (dict): The `lower_bound` and `upper_bound` of the src visits to merge.
+        """
+        cursor.execute(SELECT_VISITS_RELKIND_QUERY)
+        if cursor.fetchone()[0] != 'p':
+            logging.warning("visits is not a partitioned table, partition management skipped")
+            return
+        cursor.execute(SELECT_SRC_GENERATED_VISITS_MIN_TIMESTAMP_QUERY, visits_range)
+        first_timestamp = cursor.fetchone()[0] or visits_range['upper_bound']
+        month_start = datetime(first_timestamp.year, first_timestamp.month, 1)
+        last_timestamp = visits_range['upper_bound'] - timedelta(days=1)
+        last_month_start = self.add_months(datetime(last_timestamp.year, last_timestamp.month, 1),
+                                           self.partition_months_ahead)
+        while month_start <= last_month_start:
+            next_month_start = self.add_months(month_start, 1)
+            cursor.execute(
+                CREATE_VISITS_PARTITION_QUERY.format(partition_name=f"visits_{month_start:%Y_%m}"),
+                {'lower_bound': month_start, 'upper_bound': next_month_start}
+            )
+            month_start = next_month_start
+
+    def merge_data(self, cursor, visits_range):
+        """
+        Merge src data into the 3NF tables with the configured merge strategy.
+
+        src visits sharing a (facility, patient, visit_timestamp) merge key are merged once with both strategies,
+        keeping the one with the highest treatment_cost, then the longest duration. Visits already in `visits`
+        are left unchanged.
+
+        Args:
+            cursor: A psycopg2 cursor object.
+            visits_range (dict): The `lower_bound` and `upper_bound` of the src visits to merge.
+        """
+        if self.merge_strategy == 'on_conflict':
+            cursor.execute(INSERT_ON_CONFLICT_FACILITIES_QUERY)
+            cursor.execute(INSERT_ON_CONFLICT_PATIENTS_QUERY)
+            cursor.execute(INSERT_ON_CONFLICT_VISITS_QUERY, visits_range)
+        else:
+            cursor.execute(MERGE_FACILITIES_QUERY)
+            cursor.execute(MERGE_PATIENTS_QUERY)
+            cursor.execute(MERGE_VISITS_QUERY, visits_range)
+        logging.info(f"Merged {cursor.rowcount} visits from [{visits_range['lower_bound']}, "
+                     f"{visits_range['upper_bound']})")
 
     def load_data(self):
         """
@@ -34,9 +212,12 @@ class NF3Loader:
 
         This method performs the following steps:
         1. Creates the necessary tables (facilities, patients, visits) if they do not already exist.
-        2. Merges data into the 3NF tables using predefined SQL queries.
-        3. Commits the transaction if all operations succeed.
-        4. Rolls back the transaction and prints the error if any operation fails.
+        2. Creates the unique indexes on the merge keys if manage_indexes is enabled.
+        3. Reads the visits load watermark, creates the needed monthly partitions if partition_visits is
+           enabled, and merges data into the 3NF tables using the configured merge strategy.
+        4. Advances the watermark to just past the latest merged src visit, at most to the end of date_scope.
+        5. Commits the transaction if all operations succeed.
+        6. Rolls back the transaction and prints the error if any operation fails.
 
         Raises:
             Exception: If any SQL execution fails, the exception is caught, the transaction is rolled back,
@@ -47,12 +228,22 @@ class NF3Loader:
             # Create tables if they do not exist
             cursor.execute(CREATE_FACILITIES_TABLE_QUERY)
             cursor.execute(CREATE_PATIENTS_TABLE_QUERY)
-            cursor.execute(CREATE_VISITS_TABLE_QUERY)
+            cursor.execute(CREATE_VISITS_PARTITIONED_TABLE_QUERY if self.partition_visits
+                           else CREATE_VISITS_TABLE_QUERY)
+            cursor.execute(CREATE_LOAD_WATERMARK_TABLE_QUERY)
 
-            # Merge data into 3NF tables
-            cursor.execute(MERGE_FACILITIES_QUERY)
-            cursor.execute(MERGE_PATIENTS_QUERY)
-            cursor.execute(MERGE_VISITS_QUERY, {'date_scope': load_config.date_scope})
+            # Create merge key indexes if they do not exist
+            if self.manage_indexes:
+                self.create_indexes(cursor)
+
+            # Merge data into 3NF tables and advance the watermark in the same transaction
+            visits_range = self.get_visits_range(cursor)
+            if self.partition_visits:
+                self.create_visits_partitions(cursor, visits_range)
+            self.merge_data(cursor, visits_range)
+            watermark = self.get_visits_watermark(cursor, visits_range)
+            if watermark is not None:
+                cursor.execute(UPSERT_LOAD_WATERMARK_QUERY, {'table_name': 'visits', 'watermark': watermark})
 
             # Commit the transaction
             self.conn.commit()
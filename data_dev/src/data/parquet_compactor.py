@@ -0,0 +1,220 @@
+import os
+import ctypes
+import errno
+import logging
+import math
+import shutil
+from uuid import uuid4
+
+import pyarrow.dataset as ds
+
+from data_dev.config import parquet_storage_config, compaction_config
+from data_dev.src.data.parquet_layout import parquet_file_options, sort_batch
+
+AT_FDCWD = -100
+RENAME_EXCHANGE = 2
+# Errors of renameat2 on kernels and file systems (overlayfs, NFS, FUSE) without RENAME_EXCHANGE support
+RENAME_EXCHANGE_UNSUPPORTED_ERRORS = {errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP, errno.ENOTSUP, errno.EXDEV}
+
+
+def exchange_directories(path, other_path):
+    """
+    Atomically exchanges two directories with the Linux renameat2 RENAME_EXCHANGE call.
+
+    Args:
+        path (str): The first directory.
+        other_path (str): The second directory.
+
+    Returns:
+        bool: True if the directories were exchanged, False if the call is not available on this platform or
+              not supported by the file system.
+    """
+    renameat2 = getattr(ctypes.CDLL(None, use_errno=True), 'renameat2', None)
+    if renameat2 is None:
+        return False
+    if renameat2(AT_FDCWD, os.fsencode(path), AT_FDCWD, os.fsencode(other_path), RENAME_EXCHANGE) != 0:
+        error = ctypes.get_errno()
+        if error in RENAME_EXCHANGE_UNSUPPORTED_ERRORS:
+            return False
+        raise OSError(error, os.strerror(error), path)
+    return True
+
+
+class ParquetCompactor:
+    """
+    A class to compact the partitions of the parquet datasets into files of a target size.
+
+    Repeated exports leave many small files per partition, and every reader pays the file open and footer
+    cost per file. The compactor rewrites each partition holding more files than its size needs into files of
+    about target_file_size_mb, with the layout settings of parquet_storage_config, and swaps the rewritten
+    partition in:
+
+    1. The partition is rewritten into a hidden sibling directory (`.<partition>.<id>.compacting`), which
+       parquet readers skip.
+    2. The hidden directory and the partition directory are exchanged in one renameat2(RENAME_EXCHANGE) call, so
+       readers see either all old files or all new files. Where the call is not available the partition is
+       renamed aside and the new directory renamed in, leaving it absent for the instant in between.
+    3. The old files, now in the hidden directory, are deleted.
+
+    A reader that listed the partition before the swap and opens a file after it gets a FileNotFoundError and
+    has to re-list; it never sees a mix of old and new files.
+
+    Attributes:
+        enabled (bool): Whether compaction runs, sourced from compaction_config.enabled.
+        target_file_size (int): The target file size in bytes, sourced from compaction_config.target_file_size_mb.
+        storage_paths (List[str]): The dataset directories, sourced from parquet_storage_config.
+
+    Methods:
+        - list_partitions(storage_path): Returns the partition directories of a dataset.
+        - list_files(partition_path): Returns the parquet files of a partition.
+        - needs_compaction(files): Returns whether a partition holds more files than its size needs.
+        - rewrite_partition(partition_path, files, target_path): Rewrites the files of a partition into target_path.
+        - swap_partition(partition_path, compacted_path): Swaps a rewritten partition in and removes the old files.
+        - compact_partition(partition_path): Compacts one partition if it needs compaction.
+        - compact(): Compacts every partition of the three datasets.
+    """
+
+    def __init__(self):
+        """
+        Initializes the ParquetCompactor with configuration values.
+        """
+        self.enabled = compaction_config.enabled
+        self.target_file_size = compaction_config.target_file_size_mb * 2 ** 20
+        self.storage_paths = [
+            parquet_storage_config.storage_path_facility_type_avg_time_spent_per_visit_date,
+            parquet_storage_config.storage_path_patient_sum_treatment_cost_per_facility_type,
+            parquet_storage_config.storage_path_facility_name_min_time_spent_per_visit_date
+        ]
+
+    @staticmethod
+    def list_partitions(storage_path):
+        """
+        Returns the partition directories of a dataset, skipping hidden and underscore-prefixed entries.
+
+        Args:
+            storage_path (str): The dataset directory.
+
+        Returns:
+            List[str]: The partition directory paths.
+        """
+        if not os.path.isdir(storage_path):
+            return []
+        return sorted(
+            entry.path for entry in os.scandir(storage_path)
+            if entry.is_dir() and not entry.name.startswith(('.', '_'))
+        )
+
+    @staticmethod
+    def list_files(partition_path):
+        """
+        Returns the parquet files of a partition, skipping hidden and underscore-prefixed files.
+
+        Args:
+            partition_path (str): The partition directory.
+
+        Returns:
+            List[str]: The parquet file paths.
+        """
+        return sorted(
+            entry.path for entry in os.scandir(partition_path)
+            if entry.is_file() and entry.name.endswith('.parquet') and not entry.name.startswith(('.', '_'))
+        )
+
+    def needs_compaction(self, files):
+        """
+        Returns whether a partition holds more files than its size needs at the target file size.
+
+        Args:
+            files (List[str]): The parquet files of the partition.
+
+        Returns:
+            bool: True if compaction would reduce the number of files.
+        """
+        total_size = sum(os.path.getsize(path) for path in files)
+        return len(files) > max(1, math.ceil(total_size / self.target_file_size))
+
+    def rewrite_partition(self, partition_path, files, target_path):
+        """
+        Rewrites the files of a partition into files of about the target size in target_path.
+
+        The number of rows per file is estimated from the rows and bytes of the existing files. The rows are
+        sorted by the layout sort columns and written in that order without threads, so the compacted files keep
+        the ordering row group statistics rely on.
+
+        Args:
+            partition_path (str): The partition directory.
+            files (List[str]): The parquet files of the partition.
+            target_path (str): The directory the compacted files are written to.
+        """
+        dataset = ds.dataset(files, format='parquet')
+        total_rows = dataset.count_rows()
+        total_size = sum(os.path.getsize(path) for path in files)
+        rows_per_file = max(1, math.ceil(total_rows * self.target_file_size / max(total_size, 1)))
+        ds.write_dataset(
+            sort_batch(dataset.to_table()),
+            target_path,
+            format='parquet',
+            file_options=parquet_file_options(dataset.schema.names),
+            basename_template=f'{uuid4().hex}-{{i}}.parquet',
+            max_rows_per_file=rows_per_file,
+            max_rows_per_group=min(rows_per_file, 1 << 20),
+            use_threads=False
+        )
+        logging.info(f"Rewrote {len(files)} files ({total_rows} rows) of {partition_path}")
+
+    @staticmethod
+    def swap_partition(partition_path, compacted_path):
+        """
+        Swaps a rewritten partition in and removes the old files.
+
+        If the fallback fails to rename the rewritten partition in, the old partition is renamed back.
+
+        Args:
+            partition_path (str): The partition directory.
+            compacted_path (str): The hidden directory holding the rewritten files.
+        """
+        if not exchange_directories(compacted_path, partition_path):
+            retired_path = f"{compacted_path}.old"
+            os.rename(partition_path, retired_path)
+            try:
+                os.rename(compacted_path, partition_path)
+            except OSError:
+                os.rename(retired_path, partition_path)
+                raise
+            compacted_path = retired_path
+        shutil.rmtree(compacted_path)
+
+    def compact_partition(self, partition_path):
+        """
+        Compacts one partition if it holds more files than its size needs.
+
+        Args:
+            partition_path (str): The partition directory.
+
+        Returns:
+            bool: True if the partition was compacted.
+        """
+        files = self.list_files(partition_path)
+        if not self.needs_compaction(files):
+            return False
+        parent, name = os.path.split(partition_path)
+        compacted_path = os.path.join(parent, f".{name}.{uuid4().hex}.compacting")
+        try:
+            self.rewrite_partition(partition_path, files, compacted_path)
+            self.swap_partition(partition_path, compacted_path)
+        finally:
+            # Left behind only if the rewrite or the swap failed
+            shutil.rmtree(compacted_path, ignore_errors=True)
+        return True
+
+    def compact(self):
+        """
+        Compacts every partition of the three datasets.
+        """
+        if not self.enabled:
+            logging.info("Parquet compaction is disabled")
+            return
+        for storage_path in self.storage_paths:
+            partitions = self.list_partitions(storage_path)
+            compacted = sum(self.compact_partition(partition_path) for partition_path in partitions)
+            logging.info(f"Compacted {compacted} of {len(partitions)} partitions of {storage_path}")
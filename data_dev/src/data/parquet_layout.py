@@ -0,0 +1,111 @@
+import pyarrow.dataset as ds
+
+from data_dev.config import parquet_storage_config
+
+
+def bloom_filters_supported():
+    """
+    Returns whether the installed pyarrow writes Parquet bloom filters.
+
+    pyarrow releases before bloom filter support (such as the pinned 19.x) reject the bloom_filter_options
+    writer option.
+
+    Returns:
+        bool: True if bloom_filter_options is accepted.
+    """
+    try:
+        ds.ParquetFileFormat().make_write_options(bloom_filter_options={})
+    except TypeError:
+        return False
+    return True
+
+
+# Whether bloom_filter_columns are written, False on pyarrow releases without bloom filter support
+BLOOM_FILTERS_SUPPORTED = bloom_filters_supported()
+
+
+def parquet_writer_options(columns, layout=parquet_storage_config):
+    """
+    Builds the Parquet writer options of a dataset from the layout settings.
+
+    The options are accepted by pyarrow.dataset.ParquetFileFormat.make_write_options and, as keyword arguments,
+    by DataFrame.to_parquet with partition_cols.
+
+    Args:
+        columns (List[str]): The columns of the dataset. Layout columns missing from it are ignored, and so are
+                             the bloom filter columns when the installed pyarrow has no bloom filter support.
+        layout (ParquetStorageConfig): The layout settings. Defaults to parquet_storage_config.
+
+    Returns:
+        dict: The writer options.
+    """
+    options = {
+        'compression': layout.compression,
+        'compression_level': layout.compression_level,
+        'write_page_index': layout.write_page_index
+    }
+    if layout.dictionary_columns is not None:
+        options['use_dictionary'] = [column for column in layout.dictionary_columns if column in columns]
+    bloom_filter_columns = [column for column in layout.bloom_filter_columns if column in columns]
+    if bloom_filter_columns and BLOOM_FILTERS_SUPPORTED:
+        options['bloom_filter_options'] = {column: {'ndv': layout.bloom_filter_ndv} for column in bloom_filter_columns}
+    return options
+
+
+def parquet_file_options(columns, layout=parquet_storage_config):
+    """
+    Builds the pyarrow.dataset file write options of a dataset from the layout settings.
+
+    Args:
+        columns (List[str]): The columns of the dataset.
+        layout (ParquetStorageConfig): The layout settings. Defaults to parquet_storage_config.
+
+    Returns:
+        pyarrow.dataset.ParquetFileWriteOptions: The file write options.
+    """
+    return ds.ParquetFileFormat().make_write_options(**parquet_writer_options(columns, layout))
+
+
+def row_group_options(layout=parquet_storage_config):
+    """
+    Builds the row group size arguments of pyarrow.dataset.write_dataset from the layout settings.
+
+    Args:
+        layout (ParquetStorageConfig): The layout settings. Defaults to parquet_storage_config.
+
+    Returns:
+        dict: min_rows_per_group and max_rows_per_group, or nothing for the pyarrow default.
+    """
+    if layout.row_group_size is None:
+        return {}
+    return {'min_rows_per_group': layout.row_group_size, 'max_rows_per_group': layout.row_group_size}
+
+
+def sort_batch(batch, layout=parquet_storage_config):
+    """
+    Sorts an Arrow record batch or table by the layout sort columns it contains.
+
+    Args:
+        batch (Union[pyarrow.RecordBatch, pyarrow.Table]): The data to sort.
+        layout (ParquetStorageConfig): The layout settings. Defaults to parquet_storage_config.
+
+    Returns:
+        Union[pyarrow.RecordBatch, pyarrow.Table]: The sorted data.
+    """
+    sort_keys = [(column, 'ascending') for column in layout.sort_columns if column in batch.schema.names]
+    return batch.sort_by(sort_keys) if sort_keys else batch
+
+
+def sort_frame(df, layout=parquet_storage_config):
+    """
+    Sorts a DataFrame by the layout sort columns it contains.
+
+    Args:
+        df (pd.DataFrame): The data to sort.
+        layout (ParquetStorageConfig): The layout settings. Defaults to parquet_storage_config.
+
+    Returns:
+        pd.DataFrame: The sorted data.
+    """
+    sort_columns = [column for column in layout.sort_columns if column in df.columns]
+    return df.sort_values(sort_columns, ignore_index=True) if sort_columns else df
@@ -1,12 +1,86 @@
 import os
+import json
+import logging
+import shutil
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from uuid import uuid4
+
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pv
+import pyarrow.dataset as ds
 
 from data_dev.queries import (
     TRANSFORM_PATIENT_SUM_TREATMENT_COST_PER_FACILITY_TYPE_SQL,
     TRANSFORM_FACILITY_NAME_MIN_TIME_SPENT_PER_VISIT_DATE_SQL,
     TRANSFORM_FACILITY_TYPE_AVG_TIME_SPENT_PER_VISIT_DATE_SQL
 )
-from data_dev.config import parquet_storage_config
+from data_dev.queries import (
+    SELECT_VISITS_HIGH_WATER_MARK_QUERY,
+    SELECT_TOUCHED_VISIT_MONTHS_QUERY,
+    SELECT_TOUCHED_FACILITY_TYPES_QUERY,
+    FILTER_EXPORT_BY_PARTITION_DATE_QUERY,
+    FILTER_EXPORT_BY_FACILITY_TYPE_PARTITION_QUERY,
+    SELECT_PARTITION_DATE_FINGERPRINTS_QUERY,
+    SELECT_FACILITY_TYPE_PARTITION_FINGERPRINTS_QUERY
+)
+from data_dev.queries import (
+    SELECT_FACILITY_TYPE_AVG_TIME_SPENT_PER_VISIT_DATE_VIEW_SQL,
+    SELECT_PATIENT_SUM_TREATMENT_COST_PER_FACILITY_TYPE_VIEW_SQL,
+    SELECT_FACILITY_NAME_MIN_TIME_SPENT_PER_VISIT_DATE_VIEW_SQL
+)
+from data_dev.queries import SELECT_VISITS_WITH_FACILITIES_SQL, SELECT_PATIENT_NAMES_SQL
+from data_dev.config import parquet_storage_config, parquet_export_config
+from data_dev.src.connectors.postgre_connector import PostgresConnectorContextManager
+from data_dev.src.data.parquet_layout import (
+    parquet_writer_options,
+    parquet_file_options,
+    row_group_options,
+    sort_batch,
+    sort_frame
+)
+from data_dev.src.data import arrow_transforms
+from data_dev.src.data.report_summary import update_report_summary
+
+# Arrow schemas of the exported datasets, including their partition column
+FACILITY_TYPE_AVG_TIME_SPENT_PER_VISIT_DATE_SCHEMA = pa.schema([
+    ('facility_type', pa.string()),
+    ('visit_date', pa.timestamp('ns')),
+    ('avg_time_spent', pa.float64()),
+    ('partition_date', pa.string())
+])
+
+PATIENT_SUM_TREATMENT_COST_PER_FACILITY_TYPE_SCHEMA = pa.schema([
+    ('facility_type', pa.string()),
+    ('full_name', pa.string()),
+    ('sum_treatment_cost', pa.float64()),
+    ('facility_type_partition', pa.string())
+])
+
+FACILITY_NAME_MIN_TIME_SPENT_PER_VISIT_DATE_SCHEMA = pa.schema([
+    ('facility_name', pa.string()),
+    ('visit_date', pa.timestamp('ns')),
+    ('min_time_spent', pa.int64()),
+    ('partition_date', pa.string())
+])
+
+# Queries finding the partitions touched by new visits and restricting a transform query to them, per partition column
+INCREMENTAL_PARTITION_QUERIES = {
+    'partition_date': (SELECT_TOUCHED_VISIT_MONTHS_QUERY, FILTER_EXPORT_BY_PARTITION_DATE_QUERY),
+    'facility_type_partition': (SELECT_TOUCHED_FACILITY_TYPES_QUERY, FILTER_EXPORT_BY_FACILITY_TYPE_PARTITION_QUERY)
+}
+
+# Queries fingerprinting the partitions of a transform query result, per partition column
+PARTITION_FINGERPRINT_QUERIES = {
+    'partition_date': SELECT_PARTITION_DATE_FINGERPRINTS_QUERY,
+    'facility_type_partition': SELECT_FACILITY_TYPE_PARTITION_FINGERPRINTS_QUERY
+}
+
+# Export state file kept in every dataset directory; the '_' prefix keeps it out of parquet dataset reads
+EXPORT_STATE_FILE_NAME = '_export_state.json'
 
 
 class LoadParquet:
@@ -17,30 +91,101 @@ class LoadParquet:
     -----------
     connection_object : object
         Database connection object used to execute SQL queries.
+    connection_factory : Callable
+        Returns a context manager yielding a new database connection object, used by concurrent transforms.
     storage_path_facility_type_avg_time_spent_per_visit_date : str
         Path to store the Parquet file for facility type average time spent per visit date.
     storage_path_patient_sum_treatment_cost_per_facility_type : str
         Path to store the Parquet file for patient sum treatment cost per facility type.
     storage_path_facility_name_min_time_spent_per_visit_date : str
         Path to store the Parquet file for facility name minimum time spent per visit date.
+    storage_path_report_summary : str or None
+        Path of the rolling summary of the last days of facility type average time spent per visit date, None to
+        not maintain it.
+    extract_method : str
+        'pandas' or 'stream', sourced from parquet_export_config.extract_method.
+    itersize : int
+        Rows per streamed chunk, sourced from parquet_export_config.itersize.
+    copy_block_size : int
+        CSV bytes parsed per record batch, sourced from parquet_export_config.copy_block_size.
+    refresh_mode : str
+        'full' or 'incremental', sourced from parquet_export_config.refresh_mode.
+    num_workers : int
+        Number of transforms run concurrently, sourced from parquet_export_config.num_workers.
+    engine : str
+        'postgres' or 'arrow', sourced from parquet_export_config.engine.
+    use_materialized_views : bool
+        Whether the 'postgres' engine reads the transform results from the materialized views maintained by
+        TransformViews, sourced from parquet_export_config.use_materialized_views.
+    skip_unchanged_partitions : bool
+        Whether partitions whose content fingerprint did not change are left unwritten, sourced from
+        parquet_export_config.skip_unchanged_partitions.
+    report_summary_days : int
+        Days kept in the rolling summary, sourced from parquet_export_config.report_summary_days.
 
     Methods:
     --------
-    read_data(query):
+    read_data(query, params=None):
         Executes the given SQL query and returns the result as a DataFrame.
+    iter_data(query, params=None):
+        Executes the given SQL query on a server-side cursor and yields the result in DataFrame chunks.
+    iter_copy_batches(query, schema, params=None):
+        Executes the given SQL query as COPY ... TO STDOUT and yields the result as Arrow record batches.
     to_parquet(df, storage_path, partition_columns):
         Writes the given DataFrame to a Parquet file at the specified storage path, partitioned by the given columns.
+    write_batches(batches, schema, storage_path, partition_columns):
+        Writes a stream of Arrow record batches to a partitioned Parquet dataset.
+    add_partition_date(df):
+        Adds the monthly partition_date column derived from visit_date.
+    add_facility_type_partition(df):
+        Adds the facility_type_partition column derived from facility_type.
+    add_partition_date_to_batch(batch):
+        Adds the monthly partition_date column to a record batch with Arrow compute.
+    add_facility_type_partition_to_batch(batch):
+        Adds the facility_type_partition column to a record batch with Arrow compute.
+    read_export_state(storage_path):
+        Reads the export state of a dataset, or None if no export state has been written yet.
+    write_export_state(storage_path, state):
+        Atomically replaces the export state of a dataset.
+    get_visits_high_water_mark():
+        Returns the highest `visits.id`.
+    get_touched_partitions(partition_column, watermark, high_water_mark):
+        Returns the partitions holding visits with an id in (watermark, high_water_mark].
+    filter_partitions(query, partition_column, partitions):
+        Restricts a transform query to the given partitions.
+    get_partition_fingerprints(query, params, partition_column):
+        Returns the content fingerprint of every partition of a transform query result.
+    get_changed_partitions(storage_path, partition_column, fingerprints, stored_fingerprints):
+        Returns the partitions whose fingerprint differs from the stored one or that are missing on disk.
+    extract_and_write(query, params, storage_path, partition_columns, prepare, prepare_batch, schema):
+        Runs a query and writes its result with the configured extract method.
+    export(query, storage_path, partition_columns, prepare, prepare_batch, schema):
+        Exports a transform query result, refreshing all or only the touched partitions.
     transform_facility_type_avg_time_spent_per_visit_date():
         Transforms data for facility type average time spent per visit date and writes it to a Parquet file.
     transform_patient_sum_treatment_cost_per_facility_type():
         Transforms data for patient sum treatment cost per facility type and writes it to a Parquet file.
     transform_facility_name_min_time_spent_per_visit_date():
         Transforms data for facility name minimum time spent per visit date and writes it to a Parquet file.
+    run_transform(transform_name):
+        Runs one transformation and returns its duration in seconds.
+    run_transform_with_own_connection(transform_name):
+        Runs one transformation on a new connection from connection_factory.
+    write_table(table, storage_path, partition_columns, prepare_batch, schema):
+        Writes an Arrow table of transform results to a partitioned Parquet dataset.
+    load_parquet_single_scan():
+        Computes all three datasets from one scan of the visits with Arrow compute and writes them.
     load_parquet():
         Executes all transformations and loads the results into Parquet files.
     """
 
-    def __init__(self, connection_object):
+    TRANSFORMS = (
+        'transform_facility_type_avg_time_spent_per_visit_date',
+        'transform_patient_sum_treatment_cost_per_facility_type',
+        'transform_facility_name_min_time_spent_per_visit_date'
+    )
+
+    def __init__(self, connection_object, connection_factory=PostgresConnectorContextManager):
         """
         Initializes the LoadParquet class with a database connection object and storage paths.
 
@@ -48,8 +193,12 @@ class LoadParquet:
         -----------
         connection_object : object
             Database connection object used to execute SQL queries.
+        connection_factory : Callable, optional
+            Returns a context manager yielding a new database connection object, used to give every concurrent
+            transform its own connection. Defaults to PostgresConnectorContextManager.
         """
         self.connection_object = connection_object
+        self.connection_factory = connection_factory
         self.storage_path_facility_type_avg_time_spent_per_visit_date = (
             parquet_storage_config.storage_path_facility_type_avg_time_spent_per_visit_date
         )
@@ -59,8 +208,18 @@ class LoadParquet:
         self.storage_path_facility_name_min_time_spent_per_visit_date = (
             parquet_storage_config.storage_path_facility_name_min_time_spent_per_visit_date
         )
+        self.storage_path_report_summary = parquet_storage_config.storage_path_report_summary
+        self.extract_method = parquet_export_config.extract_method
+        self.itersize = parquet_export_config.itersize
+        self.copy_block_size = parquet_export_config.copy_block_size
+        self.refresh_mode = parquet_export_config.refresh_mode
+        self.num_workers = parquet_export_config.num_workers
+        self.engine = parquet_export_config.engine
+        self.use_materialized_views = parquet_export_config.use_materialized_views
+        self.skip_unchanged_partitions = parquet_export_config.skip_unchanged_partitions
+        self.report_summary_days = parquet_export_config.report_summary_days
 
-    def read_data(self, query):
+    def read_data(self, query, params=None):
         """
         Executes the given SQL query and returns the result as a DataFrame.
 
@@ -68,20 +227,80 @@ class LoadParquet:
         -----------
         query : str
             SQL query to execute.
+        params : dict, optional
+            Parameters bound to the query placeholders.
 
         Returns:
         --------
         DataFrame
             Resulting data from the SQL query.
         """
-        df = self.connection_object.get_data_sql(query=query)
+        df = self.connection_object.get_data_sql(query=query, params=params)
         return df
 
+    def iter_data(self, query, params=None):
+        """
+        Executes the given SQL query on a server-side cursor and yields the result in DataFrame chunks.
+
+        Parameters:
+        -----------
+        query : str
+            SQL query to execute.
+        params : dict, optional
+            Parameters bound to the query placeholders.
+
+        Returns:
+        --------
+        Iterator[DataFrame]
+            Chunks of at most `itersize` rows of the SQL query result.
+        """
+        return self.connection_object.iter_data_sql(query=query, itersize=self.itersize, params=params)
+
+    def iter_copy_batches(self, query, schema, params=None):
+        """
+        Executes the given SQL query as COPY ... TO STDOUT and yields the result as Arrow record batches.
+
+        The CSV stream is spooled to a temporary file and parsed block by block with the columns of `schema`,
+        so neither Python objects per cell nor the full result as a table are built on the client.
+
+        Parameters:
+        -----------
+        query : str
+            SQL query to execute.
+        schema : pyarrow.Schema
+            Types of the query result columns, in query column order.
+        params : dict, optional
+            Parameters bound to the query placeholders.
+
+        Returns:
+        --------
+        Iterator[pyarrow.RecordBatch]
+            Record batches of the SQL query result.
+        """
+        with tempfile.TemporaryFile() as buffer:
+            self.connection_object.copy_data_sql(query=query, file=buffer, params=params)
+            buffer.seek(0)
+            reader = pv.open_csv(
+                buffer,
+                read_options=pv.ReadOptions(block_size=self.copy_block_size),
+                convert_options=pv.ConvertOptions(
+                    column_types=schema,
+                    include_columns=schema.names,
+                    null_values=[''],
+                    strings_can_be_null=True,
+                    quoted_strings_can_be_null=False
+                )
+            )
+            for batch in reader:
+                yield batch
+
     @staticmethod
     def to_parquet(df, storage_path, partition_columns):
         """
         Writes the given DataFrame to a Parquet file at the specified storage path, partitioned by the given columns.
 
+        The rows are sorted and written with the layout settings of parquet_storage_config.
+
         Parameters:
         -----------
         df : DataFrame
@@ -92,57 +311,559 @@ class LoadParquet:
             Columns to partition the Parquet file by.
         """
         os.makedirs(storage_path, exist_ok=True)
-        df.to_parquet(
+        sort_frame(df).to_parquet(
             storage_path,
             engine='pyarrow',
             partition_cols=partition_columns,
             index=False,
-            existing_data_behavior='delete_matching'
+            existing_data_behavior='delete_matching',
+            **parquet_writer_options(df.columns),
+            **row_group_options()
         )
 
-    def transform_facility_type_avg_time_spent_per_visit_date(self):
+    @staticmethod
+    def write_batches(batches, schema, storage_path, partition_columns):
         """
-        Transforms data for facility type average time spent per visit date and writes it to a Parquet file.
+        Writes a stream of Arrow record batches to a hive-partitioned Parquet dataset.
+
+        Batches are consumed one at a time, so the full dataset never has to be held in memory. Like
+        to_parquet, partitions present in the stream replace the existing files of those partitions, and the
+        layout settings of parquet_storage_config apply; rows are sorted within each batch.
+
+        Parameters:
+        -----------
+        batches : Iterator[pyarrow.RecordBatch]
+            Record batches matching `schema`.
+        schema : pyarrow.Schema
+            Schema of the batches, including the partition columns.
+        storage_path : str
+            Path to store the Parquet dataset.
+        partition_columns : list
+            Columns to partition the Parquet dataset by.
+        """
+        os.makedirs(storage_path, exist_ok=True)
+        ds.write_dataset(
+            (sort_batch(batch) for batch in batches),
+            storage_path,
+            schema=schema,
+            format='parquet',
+            file_options=parquet_file_options(schema.names),
+            partitioning=ds.partitioning(
+                pa.schema([schema.field(column) for column in partition_columns]), flavor='hive'
+            ),
+            basename_template=f'{uuid4().hex}-{{i}}.parquet',
+            existing_data_behavior='delete_matching',
+            **row_group_options()
+        )
+
+    @staticmethod
+    def add_partition_date(df):
+        """
+        Converts visit_date to datetime and adds the monthly partition_date column ('YYYY-MM').
         """
-        df = self.read_data(TRANSFORM_FACILITY_TYPE_AVG_TIME_SPENT_PER_VISIT_DATE_SQL)
         df['visit_date'] = pd.to_datetime(df['visit_date'])
         df['partition_date'] = df['visit_date'].dt.to_period('M').astype(str)
-        self.to_parquet(
-            df=df,
+        return df
+
+    # TODO: do better approach for: df['facility_type_partition'] = df['facility_type'] - workaround,
+    @staticmethod
+    def add_facility_type_partition(df):
+        """
+        Adds the facility_type_partition column (facility_type with spaces replaced by underscores).
+        """
+        df['facility_type_partition'] = df['facility_type'].str.replace(" ", "_")
+        return df
+
+    @staticmethod
+    def add_partition_date_to_batch(batch):
+        """
+        Adds the monthly partition_date column ('YYYY-MM') derived from visit_date to a record batch.
+        """
+        partition_date = pc.strftime(batch.column('visit_date'), format='%Y-%m')
+        return pa.RecordBatch.from_arrays(batch.columns + [partition_date],
+                                          names=batch.schema.names + ['partition_date'])
+
+    @staticmethod
+    def add_facility_type_partition_to_batch(batch):
+        """
+        Adds the facility_type_partition column (facility_type with spaces replaced by underscores) to a record batch.
+        """
+        facility_type_partition = pc.replace_substring(batch.column('facility_type'), pattern=' ', replacement='_')
+        return pa.RecordBatch.from_arrays(batch.columns + [facility_type_partition],
+                                          names=batch.schema.names + ['facility_type_partition'])
+
+    @staticmethod
+    def read_export_state(storage_path):
+        """
+        Reads the export state of a dataset.
+
+        Parameters:
+        -----------
+        storage_path : str
+            Path of the Parquet dataset.
+
+        Returns:
+        --------
+        dict or None
+            The export state with the `visits_watermark` of the last successful incremental export and the
+            `partition_fingerprints` of the last export that skipped unchanged partitions, or None if no export
+            state has been written yet.
+        """
+        path = os.path.join(storage_path, EXPORT_STATE_FILE_NAME)
+        if not os.path.exists(path):
+            return None
+        with open(path) as state_file:
+            return json.load(state_file)
+
+    @staticmethod
+    def write_export_state(storage_path, state):
+        """
+        Atomically replaces the export state of a dataset.
+
+        Parameters:
+        -----------
+        storage_path : str
+            Path of the Parquet dataset.
+        state : dict
+            The export state to store.
+        """
+        path = os.path.join(storage_path, EXPORT_STATE_FILE_NAME)
+        with open(f"{path}.tmp", 'w') as state_file:
+            json.dump(state, state_file)
+        os.replace(f"{path}.tmp", path)
+
+    def get_visits_high_water_mark(self):
+        """
+        Returns the highest `visits.id`, or 0 if `visits` is empty.
+
+        `visits` rows are only ever inserted, with increasing ids, so every visit added after an export has an
+        id above the high water mark read before it.
+        """
+        df = self.read_data(SELECT_VISITS_HIGH_WATER_MARK_QUERY)
+        return int(df['high_water_mark'].iloc[0])
+
+    def get_touched_partitions(self, partition_column, watermark, high_water_mark):
+        """
+        Returns the partitions holding visits with an id in (watermark, high_water_mark].
+
+        Parameters:
+        -----------
+        partition_column : str
+            The partition column of the dataset, a key of INCREMENTAL_PARTITION_QUERIES.
+        watermark : int
+            The `visits.id` high water mark of the last successful export.
+        high_water_mark : int
+            The current `visits.id` high water mark.
+
+        Returns:
+        --------
+        list
+            Sorted partition values, as they appear in the partition directory names.
+        """
+        touched_query, _ = INCREMENTAL_PARTITION_QUERIES[partition_column]
+        df = self.read_data(touched_query, params={'watermark': watermark, 'high_water_mark': high_water_mark})
+        return sorted(df['partition'].tolist())
+
+    @staticmethod
+    def filter_partitions(query, partition_column, partitions):
+        """
+        Restricts a transform query to the given partitions.
+
+        The filter is applied on the query's grouping columns, so Postgres pushes it below the aggregation.
+        For monthly partitions the visit date range of the partitions is added, which lets it read only those
+        months through the visits_visit_date_idx index.
+
+        Parameters:
+        -----------
+        query : str
+            Transform SQL query to restrict.
+        partition_column : str
+            The partition column of the dataset, a key of INCREMENTAL_PARTITION_QUERIES.
+        partitions : list
+            Sorted partition values to keep.
+
+        Returns:
+        --------
+        tuple
+            The restricted query and its parameters.
+        """
+        _, filter_query = INCREMENTAL_PARTITION_QUERIES[partition_column]
+        params = {'partitions': partitions}
+        if partition_column == 'partition_date':
+            params['lower_bound'] = pd.Period(partitions[0], freq='M').start_time.date()
+            params['upper_bound'] = (pd.Period(partitions[-1], freq='M') + 1).start_time.date()
+        return filter_query.format(query=query.strip().rstrip(';')), params
+
+    def get_partition_fingerprints(self, query, params, partition_column):
+        """
+        Returns the content fingerprint of every partition of a transform query result.
+
+        The fingerprint is the row count and the sum of a hash of every row's text, computed by Postgres, so it
+        does not depend on row order and only the fingerprints leave the server. It is cheap when the query reads
+        a materialized view; otherwise the transform query runs once more for it.
+
+        Parameters:
+        -----------
+        query : str
+            Transform SQL query to fingerprint.
+        params : dict or None
+            Parameters bound to the query placeholders.
+        partition_column : str
+            The partition column of the dataset, a key of PARTITION_FINGERPRINT_QUERIES.
+
+        Returns:
+        --------
+        dict
+            Fingerprints keyed by partition value, as it appears in the partition directory names.
+        """
+        fingerprint_query = PARTITION_FINGERPRINT_QUERIES[partition_column]
+        df = self.read_data(fingerprint_query.format(query=query.strip().rstrip(';')), params)
+        return dict(zip(df['partition'], df['fingerprint']))
+
+    @staticmethod
+    def get_changed_partitions(storage_path, partition_column, fingerprints, stored_fingerprints):
+        """
+        Returns the partitions whose fingerprint differs from the stored one or whose directory is missing.
+
+        Parameters:
+        -----------
+        storage_path : str
+            Path of the Parquet dataset.
+        partition_column : str
+            The partition column of the dataset.
+        fingerprints : dict
+            Current fingerprints keyed by partition value.
+        stored_fingerprints : dict
+            Fingerprints of the last export keyed by partition value.
+
+        Returns:
+        --------
+        list
+            Sorted partition values to rewrite.
+        """
+        return sorted(
+            partition for partition, fingerprint in fingerprints.items()
+            if stored_fingerprints.get(partition) != fingerprint
+            or not os.path.isdir(os.path.join(storage_path, f"{partition_column}={partition}"))
+        )
+
+    @staticmethod
+    def remove_partitions(storage_path, partition_column, partitions):
+        """
+        Removes the directories of partitions that are no longer in the transform query result.
+
+        Parameters:
+        -----------
+        storage_path : str
+            Path of the Parquet dataset.
+        partition_column : str
+            The partition column of the dataset.
+        partitions : list
+            Partition values to remove.
+        """
+        for partition in partitions:
+            shutil.rmtree(os.path.join(storage_path, f"{partition_column}={partition}"), ignore_errors=True)
+        logging.info(f"Removed {len(partitions)} partitions of {storage_path} no longer in the result: {partitions}")
+
+    def extract_and_write(self, query, params, storage_path, partition_columns, prepare, prepare_batch, schema):
+        """
+        Runs a query and writes its result to a partitioned Parquet dataset.
+
+        With extract_method 'pandas' the full result is read into one DataFrame; with 'stream' it is fetched
+        from a server-side cursor in chunks that are converted to Arrow with the declared schema and written
+        batch by batch; with 'copy' it is copied out as CSV and parsed into Arrow record batches directly,
+        deriving the partition columns with Arrow compute. Partitions present in the result replace the
+        existing files of those partitions, other partitions are left untouched.
+
+        Parameters:
+        -----------
+        query : str
+            SQL query to execute.
+        params : dict or None
+            Parameters bound to the query placeholders.
+        storage_path : str
+            Path to store the Parquet dataset.
+        partition_columns : list
+            Columns to partition the Parquet dataset by.
+        prepare : Callable[[DataFrame], DataFrame]
+            Adds the partition columns to a DataFrame of query results.
+        prepare_batch : Callable[[pyarrow.RecordBatch], pyarrow.RecordBatch]
+            Adds the partition columns to a record batch of query results.
+        schema : pyarrow.Schema
+            Schema of the written dataset, including the partition columns.
+        """
+        if self.extract_method == 'copy':
+            query_schema = pa.schema([field for field in schema if field.name not in partition_columns])
+            batches = (prepare_batch(batch) for batch in self.iter_copy_batches(query, query_schema, params))
+            self.write_batches(batches, schema, storage_path, partition_columns)
+        elif self.extract_method == 'stream':
+            batches = (
+                pa.RecordBatch.from_pandas(prepare(chunk), schema=schema, preserve_index=False)
+                for chunk in self.iter_data(query, params)
+            )
+            self.write_batches(batches, schema, storage_path, partition_columns)
+        else:
+            df = prepare(self.read_data(query, params))
+            self.to_parquet(df=df, storage_path=storage_path, partition_columns=partition_columns)
+
+    def export(self, query, storage_path, partition_columns, prepare, prepare_batch, schema):
+        """
+        Runs a transform query and writes its result to a partitioned Parquet dataset.
+
+        With refresh_mode 'full' every partition is re-exported. With 'incremental' only the partitions touched
+        by visits added since the last successful export are re-queried and rewritten, and the dataset's
+        `visits.id` watermark is advanced afterwards. The first incremental run, and any run after `visits`
+        has been rebuilt with lower ids, exports every partition.
+
+        With skip_unchanged_partitions the partitions about to be exported are fingerprinted first, and only
+        those whose fingerprint differs from the one stored in the export state are extracted and rewritten,
+        so unchanged partitions keep their files and modification times. Fingerprinted partitions missing from
+        the result, e.g. after a source delete, are removed along with their fingerprints.
+
+        Parameters:
+        -----------
+        query : str
+            Transform SQL query to execute.
+        storage_path : str
+            Path to store the Parquet dataset.
+        partition_columns : list
+            Columns to partition the Parquet dataset by.
+        prepare : Callable[[DataFrame], DataFrame]
+            Adds the partition columns to a DataFrame of query results.
+        prepare_batch : Callable[[pyarrow.RecordBatch], pyarrow.RecordBatch]
+            Adds the partition columns to a record batch of query results.
+        schema : pyarrow.Schema
+            Schema of the written dataset, including the partition columns.
+
+        Returns:
+        --------
+        list or None
+            The rewritten and removed partition values, None if every partition was rewritten.
+        """
+        transform_query, params, partitions = query, None, None
+        state = self.read_export_state(storage_path)
+        if self.refresh_mode == 'incremental':
+            watermark = state.get('visits_watermark') if state is not None else None
+            high_water_mark = self.get_visits_high_water_mark()
+            if watermark is not None and watermark <= high_water_mark:
+                partitions = self.get_touched_partitions(partition_columns[0], watermark, high_water_mark)
+                if not partitions:
+                    logging.info(f"No partitions of {storage_path} touched since visits.id {watermark}, "
+                                 f"export skipped")
+                    return []
+                logging.info(f"Refreshing {len(partitions)} partitions of {storage_path}: {partitions}")
+                query, params = self.filter_partitions(transform_query, partition_columns[0], partitions)
+            else:
+                logging.info(f"Exporting all partitions of {storage_path}")
+        new_state = {}
+        if self.refresh_mode == 'incremental':
+            new_state['visits_watermark'] = high_water_mark
+        if self.skip_unchanged_partitions:
+            stored_fingerprints = state.get('partition_fingerprints', {}) if state is not None else {}
+            fingerprints = self.get_partition_fingerprints(query, params, partition_columns[0])
+            # Without a partition filter the query covers every stored partition
+            covered = set(stored_fingerprints) if partitions is None else set(partitions) & set(stored_fingerprints)
+            removed = sorted(covered - set(fingerprints))
+            partitions = self.get_changed_partitions(storage_path, partition_columns[0], fingerprints,
+                                                     stored_fingerprints)
+            logging.info(f"{len(fingerprints) - len(partitions)} of {len(fingerprints)} partitions of "
+                         f"{storage_path} unchanged")
+            if removed:
+                self.remove_partitions(storage_path, partition_columns[0], removed)
+            new_state['partition_fingerprints'] = {
+                partition: fingerprint for partition, fingerprint in {**stored_fingerprints, **fingerprints}.items()
+                if partition not in removed
+            }
+            if partitions:
+                query, params = self.filter_partitions(transform_query, partition_columns[0], partitions)
+        if not self.skip_unchanged_partitions or partitions:
+            self.extract_and_write(query, params, storage_path, partition_columns, prepare, prepare_batch, schema)
+        # A state left by an earlier run is replaced even when empty, so stale fingerprints are dropped
+        if new_state or state is not None:
+            self.write_export_state(storage_path, new_state)
+        if self.skip_unchanged_partitions:
+            return sorted(partitions + removed)
+        return partitions
+
+    def transform_facility_type_avg_time_spent_per_visit_date(self):
+        """
+        Transforms data for facility type average time spent per visit date and writes it to a Parquet file.
+
+        If storage_path_report_summary is set, the rolling summary of the last report_summary_days days is
+        updated from the rewritten partitions.
+        """
+        partitions = self.export(
+            query=(SELECT_FACILITY_TYPE_AVG_TIME_SPENT_PER_VISIT_DATE_VIEW_SQL if self.use_materialized_views
+                   else TRANSFORM_FACILITY_TYPE_AVG_TIME_SPENT_PER_VISIT_DATE_SQL),
             storage_path=self.storage_path_facility_type_avg_time_spent_per_visit_date,
-            partition_columns=['partition_date']
+            partition_columns=['partition_date'],
+            prepare=self.add_partition_date,
+            prepare_batch=self.add_partition_date_to_batch,
+            schema=FACILITY_TYPE_AVG_TIME_SPENT_PER_VISIT_DATE_SCHEMA
         )
+        if self.storage_path_report_summary:
+            update_report_summary(self.storage_path_facility_type_avg_time_spent_per_visit_date,
+                                  self.storage_path_report_summary, self.report_summary_days, partitions)
 
-    # TODO: do better approach for: df['facility_type_partition'] = df['facility_type'] - workaround,
     def transform_patient_sum_treatment_cost_per_facility_type(self):
         """
         Transforms data for patient sum treatment cost per facility type and writes it to a Parquet file.
         """
-        df = self.read_data(TRANSFORM_PATIENT_SUM_TREATMENT_COST_PER_FACILITY_TYPE_SQL)
-        df['facility_type_partition'] = df['facility_type'].str.replace(" ", "_")
-        self.to_parquet(
-            df=df,
+        self.export(
+            query=(SELECT_PATIENT_SUM_TREATMENT_COST_PER_FACILITY_TYPE_VIEW_SQL if self.use_materialized_views
+                   else TRANSFORM_PATIENT_SUM_TREATMENT_COST_PER_FACILITY_TYPE_SQL),
             storage_path=self.storage_path_patient_sum_treatment_cost_per_facility_type,
-            partition_columns=['facility_type_partition']
+            partition_columns=['facility_type_partition'],
+            prepare=self.add_facility_type_partition,
+            prepare_batch=self.add_facility_type_partition_to_batch,
+            schema=PATIENT_SUM_TREATMENT_COST_PER_FACILITY_TYPE_SCHEMA
         )
 
     def transform_facility_name_min_time_spent_per_visit_date(self):
         """
         Transforms data for facility name minimum time spent per visit date and writes it to a Parquet file.
         """
-        df = self.read_data(TRANSFORM_FACILITY_NAME_MIN_TIME_SPENT_PER_VISIT_DATE_SQL)
-        df['visit_date'] = pd.to_datetime(df['visit_date'])
-        df['partition_date'] = df['visit_date'].dt.to_period('M').astype(str)
-        self.to_parquet(
-            df=df,
+        self.export(
+            query=(SELECT_FACILITY_NAME_MIN_TIME_SPENT_PER_VISIT_DATE_VIEW_SQL if self.use_materialized_views
+                   else TRANSFORM_FACILITY_NAME_MIN_TIME_SPENT_PER_VISIT_DATE_SQL),
             storage_path=self.storage_path_facility_name_min_time_spent_per_visit_date,
-            partition_columns=['partition_date']
+            partition_columns=['partition_date'],
+            prepare=self.add_partition_date,
+            prepare_batch=self.add_partition_date_to_batch,
+            schema=FACILITY_NAME_MIN_TIME_SPENT_PER_VISIT_DATE_SCHEMA
         )
 
+    def run_transform(self, transform_name):
+        """
+        Runs one transformation and logs its duration.
+
+        Parameters:
+        -----------
+        transform_name : str
+            Name of the transform method, one of TRANSFORMS.
+
+        Returns:
+        --------
+        float
+            Duration of the transformation in seconds.
+        """
+        start = time.perf_counter()
+        getattr(self, transform_name)()
+        elapsed = time.perf_counter() - start
+        logging.info(f"{transform_name} completed in {elapsed:.2f}s")
+        return elapsed
+
+    def run_transform_with_own_connection(self, transform_name):
+        """
+        Runs one transformation on a new connection from connection_factory.
+
+        Parameters:
+        -----------
+        transform_name : str
+            Name of the transform method, one of TRANSFORMS.
+
+        Returns:
+        --------
+        float
+            Duration of the transformation in seconds.
+        """
+        with self.connection_factory() as connection_object:
+            return LoadParquet(connection_object, self.connection_factory).run_transform(transform_name)
+
+    def write_table(self, table, storage_path, partition_columns, prepare_batch, schema):
+        """
+        Writes an Arrow table of transform results to a partitioned Parquet dataset.
+
+        Parameters:
+        -----------
+        table : pyarrow.Table
+            Transform results without the partition columns.
+        storage_path : str
+            Path to store the Parquet dataset.
+        partition_columns : list
+            Columns to partition the Parquet dataset by.
+        prepare_batch : Callable[[pyarrow.RecordBatch], pyarrow.RecordBatch]
+            Adds the partition columns to a record batch of transform results.
+        schema : pyarrow.Schema
+            Schema of the written dataset, including the partition columns.
+        """
+        query_schema = pa.schema([field for field in schema if field.name not in partition_columns])
+        table = table.select(query_schema.names).cast(query_schema).combine_chunks()
+        batches = (prepare_batch(batch) for batch in table.to_batches())
+        self.write_batches(batches, schema, storage_path, partition_columns)
+
+    def load_parquet_single_scan(self):
+        """
+        Computes all three datasets from one scan of the visits with Arrow compute and writes them.
+
+        The visits joined with facilities are copied out once (SELECT_VISITS_WITH_FACILITIES_SQL) and every
+        record batch is reduced to partial aggregates right away, so the snapshot is never held in memory; the
+        small patients table is copied out for the names. The results match the three TRANSFORM queries.
+        Every partition is rewritten; with refresh_mode 'incremental' the export state is advanced, so the
+        'postgres' engine can continue incrementally from it. The rolling report summary is rebuilt.
+        """
+        high_water_mark = self.get_visits_high_water_mark() if self.refresh_mode == 'incremental' else None
+        start = time.perf_counter()
+        partials = []
+        for batch in self.iter_copy_batches(SELECT_VISITS_WITH_FACILITIES_SQL,
+                                            arrow_transforms.VISITS_WITH_FACILITIES_SCHEMA):
+            partials.append(arrow_transforms.partial_aggregates(batch))
+            if len(partials) >= 16:
+                partials = [arrow_transforms.combine_partials(partials)]
+        if not partials:
+            partials = [arrow_transforms.partial_aggregates(
+                pa.RecordBatch.from_pylist([], schema=arrow_transforms.VISITS_WITH_FACILITIES_SCHEMA)
+            )]
+        partial = arrow_transforms.combine_partials(partials)
+        patients = pa.Table.from_batches(
+            list(self.iter_copy_batches(SELECT_PATIENT_NAMES_SQL, arrow_transforms.PATIENT_NAMES_SCHEMA)),
+            schema=arrow_transforms.PATIENT_NAMES_SCHEMA
+        )
+        logging.info(f"Scanned and aggregated visits in {time.perf_counter() - start:.2f}s")
+
+        exports = [
+            (arrow_transforms.facility_type_avg_time_spent_per_visit_date(partial),
+             self.storage_path_facility_type_avg_time_spent_per_visit_date, ['partition_date'],
+             self.add_partition_date_to_batch, FACILITY_TYPE_AVG_TIME_SPENT_PER_VISIT_DATE_SCHEMA),
+            (arrow_transforms.patient_sum_treatment_cost_per_facility_type(partial, patients),
+             self.storage_path_patient_sum_treatment_cost_per_facility_type, ['facility_type_partition'],
+             self.add_facility_type_partition_to_batch, PATIENT_SUM_TREATMENT_COST_PER_FACILITY_TYPE_SCHEMA),
+            (arrow_transforms.facility_name_min_time_spent_per_visit_date(partial),
+             self.storage_path_facility_name_min_time_spent_per_visit_date, ['partition_date'],
+             self.add_partition_date_to_batch, FACILITY_NAME_MIN_TIME_SPENT_PER_VISIT_DATE_SCHEMA)
+        ]
+        for table, storage_path, partition_columns, prepare_batch, schema in exports:
+            self.write_table(table, storage_path, partition_columns, prepare_batch, schema)
+            # The rewritten partitions are not fingerprinted, stored fingerprints are dropped
+            if high_water_mark is not None:
+                self.write_export_state(storage_path, {'visits_watermark': high_water_mark})
+            elif self.read_export_state(storage_path) is not None:
+                self.write_export_state(storage_path, {})
+            logging.info(f"Wrote {table.num_rows} rows to {storage_path}")
+        if self.storage_path_report_summary:
+            update_report_summary(self.storage_path_facility_type_avg_time_spent_per_visit_date,
+                                  self.storage_path_report_summary, self.report_summary_days)
+
     def load_parquet(self):
         """
         Executes all transformations and loads the results into Parquet files.
+
+        With num_workers above 1 the transformations run in a thread pool, each on its own connection, so one
+        transform's query runs on the server while another's result is parsed and encoded to Parquet (psycopg2
+        and pyarrow release the GIL while waiting and encoding). Every transformation is attempted; the first
+        failure is raised once all of them have finished. With engine 'arrow' all three datasets are computed
+        from a single scan instead, see load_parquet_single_scan.
         """
-        self.transform_facility_type_avg_time_spent_per_visit_date()
-        self.transform_patient_sum_treatment_cost_per_facility_type()
-        self.transform_facility_name_min_time_spent_per_visit_date()
+        start = time.perf_counter()
+        if self.engine == 'arrow':
+            self.load_parquet_single_scan()
+        elif self.num_workers > 1:
+            with ThreadPoolExecutor(max_workers=self.num_workers) as executor:
+                futures = [executor.submit(self.run_transform_with_own_connection, transform_name)
+                           for transform_name in self.TRANSFORMS]
+            for future in futures:
+                future.result()
+        else:
+            for transform_name in self.TRANSFORMS:
+                self.run_transform(transform_name)
+        logging.info(f"Parquet transformations completed in {time.perf_counter() - start:.2f}s")
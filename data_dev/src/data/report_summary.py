@@ -0,0 +1,173 @@
+import os
+import json
+import logging
+from datetime import timedelta
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+# Schema of the rolling summary of facility_type_avg_time_spent_per_visit_date
+REPORT_SUMMARY_SCHEMA = pa.schema([
+    ('facility_type', pa.string()),
+    ('visit_date', pa.timestamp('ns')),
+    ('avg_time_spent', pa.float64())
+])
+
+# Key of the summary's file metadata holding its window and the per-type minimum
+REPORT_SUMMARY_METADATA_KEY = b'report_summary'
+
+
+def list_partition_dates(dataset_path):
+    """
+    Returns the partition_date values of a dataset from the names of its partition directories.
+
+    Args:
+        dataset_path (str): The dataset directory.
+
+    Returns:
+        List[str]: The sorted 'YYYY-MM' partition values.
+    """
+    if not os.path.isdir(dataset_path):
+        return []
+    return sorted(
+        entry.name.split('=', 1)[1] for entry in os.scandir(dataset_path)
+        if entry.is_dir() and entry.name.startswith('partition_date=')
+    )
+
+
+def read_partitions(dataset_path, partitions):
+    """
+    Reads the summary columns of the given monthly partitions of a dataset.
+
+    Args:
+        dataset_path (str): The dataset directory.
+        partitions (List[str]): The partition_date values to read.
+
+    Returns:
+        pyarrow.Table: The rows of the partitions, with REPORT_SUMMARY_SCHEMA.
+    """
+    if not partitions:
+        return REPORT_SUMMARY_SCHEMA.empty_table()
+    dataset = ds.dataset([ds.dataset(os.path.join(dataset_path, f"partition_date={partition}"), format='parquet')
+                          for partition in partitions])
+    return dataset.to_table(columns=REPORT_SUMMARY_SCHEMA.names).cast(REPORT_SUMMARY_SCHEMA)
+
+
+def read_window_rows(dataset_path, partitions, days):
+    """
+    Reads the rows of the last days up to the latest visit date of a dataset.
+
+    Empty trailing partitions are skipped, so the window ends at the latest visit date actually stored.
+
+    Args:
+        dataset_path (str): The dataset directory.
+        partitions (List[str]): The sorted partition_date values of the dataset.
+        days (int): The number of days of the window.
+
+    Returns:
+        pyarrow.Table: The rows of the partitions covering the window, with REPORT_SUMMARY_SCHEMA; empty if no
+                       partition holds rows.
+    """
+    for index in range(len(partitions) - 1, -1, -1):
+        latest_rows = read_partitions(dataset_path, partitions[index:index + 1])
+        if latest_rows.num_rows > 0:
+            first_date = pc.max(latest_rows['visit_date']).as_py() - timedelta(days=days - 1)
+            return read_partitions(dataset_path, [partition for partition in partitions[:index + 1]
+                                                  if partition >= first_date.strftime('%Y-%m')])
+    return REPORT_SUMMARY_SCHEMA.empty_table()
+
+
+def read_report_summary(summary_path):
+    """
+    Reads the rolling summary and its metadata.
+
+    Args:
+        summary_path (str): The summary file.
+
+    Returns:
+        Tuple[pyarrow.Table, dict] or None: The summary rows and metadata (window_days, first_date, last_date and
+                                            min_avg_time_spent per facility type), or None if there is no summary.
+                                            The dates are None in an empty summary.
+    """
+    if not os.path.exists(summary_path):
+        return None
+    table = pq.read_table(summary_path)
+    metadata = json.loads(table.schema.metadata[REPORT_SUMMARY_METADATA_KEY])
+    return table.replace_schema_metadata(None), metadata
+
+
+def write_report_summary(rows, summary_path, days):
+    """
+    Atomically replaces the rolling summary with the given rows.
+
+    Args:
+        rows (pyarrow.Table): The rows of the window, with REPORT_SUMMARY_SCHEMA. May be empty.
+        summary_path (str): The summary file.
+        days (int): The number of days of the window.
+    """
+    rows = rows.sort_by([('visit_date', 'ascending'), ('facility_type', 'ascending')])
+    minimum = rows.group_by('facility_type').aggregate([('avg_time_spent', 'min')])
+    first_date, last_date = pc.min(rows['visit_date']).as_py(), pc.max(rows['visit_date']).as_py()
+    metadata = {
+        'window_days': days,
+        'first_date': first_date.strftime('%Y-%m-%d') if first_date is not None else None,
+        'last_date': last_date.strftime('%Y-%m-%d') if last_date is not None else None,
+        'min_avg_time_spent': dict(zip(minimum['facility_type'].to_pylist(),
+                                       minimum['avg_time_spent_min'].to_pylist()))
+    }
+    rows = rows.replace_schema_metadata({REPORT_SUMMARY_METADATA_KEY: json.dumps(metadata)})
+    os.makedirs(os.path.dirname(summary_path) or '.', exist_ok=True)
+    pq.write_table(rows, f"{summary_path}.tmp")
+    os.replace(f"{summary_path}.tmp", summary_path)
+
+
+def update_report_summary(dataset_path, summary_path, days, partitions=None):
+    """
+    Updates the rolling summary of the last days of the facility_type_avg_time_spent_per_visit_date dataset after
+    an export.
+
+    Only the rewritten partitions that can fall in the window are read: their rows replace the summary rows of
+    the same months, and the window is moved to end at the latest visit date. Without a summary, or when every
+    partition was rewritten, the summary is rebuilt from the partitions covering the window up to the latest
+    visit date, as it is after the window length changed. The summary is left untouched when no partition in
+    the window was rewritten. Empty partitions are skipped, and a dataset without rows gives an empty summary.
+
+    Args:
+        dataset_path (str): The facility_type_avg_time_spent_per_visit_date dataset directory.
+        summary_path (str): The summary file.
+        days (int): The number of days up to the latest visit date the summary keeps.
+        partitions (Optional[List[str]]): The partition_date values rewritten or removed by the export, None if
+                                          every partition was rewritten.
+
+    Returns:
+        bool: True if the summary was written.
+    """
+    all_partitions = list_partition_dates(dataset_path)
+    summary = read_report_summary(summary_path) if partitions is not None else None
+    if summary is not None and (summary[1]['window_days'] != days or summary[1]['first_date'] is None):
+        summary = None
+    if not all_partitions and not os.path.exists(summary_path):
+        return False
+    if summary is None:
+        rows = read_window_rows(dataset_path, all_partitions, days)
+    else:
+        rows, metadata = summary
+        changed = [partition for partition in sorted(set(partitions)) if partition >= metadata['first_date'][:7]]
+        if not changed:
+            return False
+        kept = rows.filter(pc.invert(pc.is_in(pc.strftime(rows['visit_date'], format='%Y-%m'),
+                                              value_set=pa.array(changed))))
+        # removed partitions only drop their rows
+        rows = pa.concat_tables([kept, read_partitions(dataset_path, [partition for partition in changed
+                                                                      if partition in all_partitions])])
+        if rows.num_rows == 0:
+            # every row of the window is gone, so the window moves back to the latest remaining rows
+            rows = read_window_rows(dataset_path, all_partitions, days)
+    if rows.num_rows > 0:
+        first_date = pc.max(rows['visit_date']).as_py() - timedelta(days=days - 1)
+        rows = rows.filter(pc.greater_equal(rows['visit_date'], pa.scalar(first_date, pa.timestamp('ns'))))
+    write_report_summary(rows, summary_path, days)
+    logging.info(f"Wrote {rows.num_rows} rows of the last {days} days to {summary_path}")
+    return True
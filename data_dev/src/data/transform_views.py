@@ -0,0 +1,129 @@
+import logging
+
+from data_dev.queries import (
+    TRANSFORM_PATIENT_SUM_TREATMENT_COST_PER_FACILITY_TYPE_SQL,
+    TRANSFORM_FACILITY_NAME_MIN_TIME_SPENT_PER_VISIT_DATE_SQL,
+    TRANSFORM_FACILITY_TYPE_AVG_TIME_SPENT_PER_VISIT_DATE_SQL
+)
+from data_dev.queries import (
+    CREATE_FACILITY_TYPE_AVG_TIME_SPENT_PER_VISIT_DATE_VIEW_QUERY,
+    CREATE_FACILITY_TYPE_AVG_TIME_SPENT_PER_VISIT_DATE_VIEW_INDEX_QUERY,
+    CREATE_PATIENT_SUM_TREATMENT_COST_PER_FACILITY_TYPE_VIEW_QUERY,
+    CREATE_PATIENT_SUM_TREATMENT_COST_PER_FACILITY_TYPE_VIEW_INDEX_QUERY,
+    CREATE_FACILITY_NAME_MIN_TIME_SPENT_PER_VISIT_DATE_VIEW_QUERY,
+    CREATE_FACILITY_NAME_MIN_TIME_SPENT_PER_VISIT_DATE_VIEW_INDEX_QUERY
+)
+from data_dev.queries import SELECT_RELATION_EXISTS_QUERY, REFRESH_MATERIALIZED_VIEW_CONCURRENTLY_QUERY
+from data_dev.config import parquet_export_config
+
+# (view name, TRANSFORM query, view query, unique index query)
+TRANSFORM_VIEWS = [
+    ('mv_facility_type_avg_time_spent_per_visit_date',
+     TRANSFORM_FACILITY_TYPE_AVG_TIME_SPENT_PER_VISIT_DATE_SQL,
+     CREATE_FACILITY_TYPE_AVG_TIME_SPENT_PER_VISIT_DATE_VIEW_QUERY,
+     CREATE_FACILITY_TYPE_AVG_TIME_SPENT_PER_VISIT_DATE_VIEW_INDEX_QUERY),
+    ('mv_patient_sum_treatment_cost_per_facility_type',
+     TRANSFORM_PATIENT_SUM_TREATMENT_COST_PER_FACILITY_TYPE_SQL,
+     CREATE_PATIENT_SUM_TREATMENT_COST_PER_FACILITY_TYPE_VIEW_QUERY,
+     CREATE_PATIENT_SUM_TREATMENT_COST_PER_FACILITY_TYPE_VIEW_INDEX_QUERY),
+    ('mv_facility_name_min_time_spent_per_visit_date',
+     TRANSFORM_FACILITY_NAME_MIN_TIME_SPENT_PER_VISIT_DATE_SQL,
+     CREATE_FACILITY_NAME_MIN_TIME_SPENT_PER_VISIT_DATE_VIEW_QUERY,
+     CREATE_FACILITY_NAME_MIN_TIME_SPENT_PER_VISIT_DATE_VIEW_INDEX_QUERY)
+]
+
+
+class TransformViews:
+    """
+    A class to maintain the TRANSFORM queries as materialized views for the parquet export.
+
+    Every view is created from its TRANSFORM query together with a unique index, which REFRESH MATERIALIZED
+    VIEW CONCURRENTLY requires. The facility_name view numbers the repeated rows of the query's UNION ALL
+    branches in a row_seq column, so that its index covers every row. A view is populated when it is created
+    and refreshed concurrently on every later run, so readers of the views are not blocked while the 3NF load's
+    changes are applied.
+
+    A view keeps the query it was created with. After a TRANSFORM query changes, drop its view so the next run
+    creates it again.
+
+    Attributes:
+        conn: A psycopg2 database connection object used to interact with the database.
+        enabled (bool): Whether the views are maintained, sourced from parquet_export_config.use_materialized_views.
+
+    Methods:
+        - view_exists(cursor, view_name): Returns whether a view exists.
+        - create_or_refresh_view(cursor, view_name, query, view_query, index_query): Creates or refreshes a view.
+        - refresh_views(): Creates or refreshes all three views.
+    """
+
+    def __init__(self, conn):
+        """
+        Initialize the TransformViews with a database connection.
+
+        Args:
+            conn: A psycopg2 database connection object.
+        """
+        self.conn = conn
+        self.enabled = parquet_export_config.use_materialized_views
+
+    @staticmethod
+    def view_exists(cursor, view_name):
+        """
+        Returns whether a relation with the given name exists.
+
+        Args:
+            cursor: A psycopg2 cursor object.
+            view_name (str): The name of the view.
+
+        Returns:
+            bool: True if the view exists.
+        """
+        cursor.execute(SELECT_RELATION_EXISTS_QUERY, {'relation_name': view_name})
+        return cursor.fetchone()[0]
+
+    def create_or_refresh_view(self, cursor, view_name, query, view_query, index_query):
+        """
+        Creates a view with its unique index, or refreshes it concurrently if it already exists.
+
+        Args:
+            cursor: A psycopg2 cursor object.
+            view_name (str): The name of the view.
+            query (str): The TRANSFORM query of the view.
+            view_query (str): The CREATE MATERIALIZED VIEW query of the view.
+            index_query (str): The CREATE UNIQUE INDEX query of the view.
+        """
+        if self.view_exists(cursor, view_name):
+            cursor.execute(REFRESH_MATERIALIZED_VIEW_CONCURRENTLY_QUERY.format(view_name=view_name))
+            logging.info(f"Refreshed materialized view {view_name}")
+        else:
+            cursor.execute(view_query.format(query=query.strip().rstrip(';')))
+            logging.info(f"Created materialized view {view_name}")
+        cursor.execute(index_query)
+
+    def refresh_views(self):
+        """
+        Creates or refreshes the materialized views of the three TRANSFORM queries.
+
+        Every view is committed on its own, so a failing view does not undo the refresh of the views before it.
+
+        Raises:
+            Exception: If any SQL execution fails, the transaction is rolled back, the error is printed and the
+                       exception is re-raised, so the parquet export does not read the stale views.
+        """
+        if not self.enabled:
+            logging.info("Materialized views of the transforms are disabled")
+            return
+        cursor = self.conn.cursor()
+        try:
+            for view_name, query, view_query, index_query in TRANSFORM_VIEWS:
+                try:
+                    self.create_or_refresh_view(cursor, view_name, query, view_query, index_query)
+                    self.conn.commit()
+                except Exception as e:
+                    # Rollback the transaction in case of an error
+                    self.conn.rollback()
+                    print(f"An error occurred during refresh of {view_name}: {e}")
+                    raise
+        finally:
+            # Close the cursor
+            cursor.close()
@@ -1,10 +1,132 @@
+import hashlib
+import html
+import json
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Optional
+
+from string import Template
+
+import numpy as np
 import pandas as pd
+import plotly
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import plotly.io as pio
+from plotly.offline import get_plotlyjs, get_plotlyjs_version
 import os
 
 from data_dev.config import report_generator_config
+from data_dev.src.data.report_summary import REPORT_SUMMARY_METADATA_KEY, read_report_summary
+
+# Number of days up to the last loaded date the report shows
+REPORT_WINDOW_DAYS = 7
+
+REPORT_TITLE = 'DQE Automation - "BI" HTML Report with Table and Doughnut Chart'
+
+TABLE_COLUMNS = ["Facility Type", "Visit Date", "Average Time Spent"]
+
+# Shared plotly.js bundle referenced by the compact reports, versioned so an upgrade writes a new file
+PLOTLY_JS_FILE_NAME = f"plotly-{get_plotlyjs_version()}.min.js"
+
+# Page of the compact report: the table rows are embedded as JSON and rendered page by page in the browser
+COMPACT_REPORT_TEMPLATE = Template("""<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>$title</title>
+<script src="$plotly_js"></script>
+<style>
+body {font-family: "Open Sans", verdana, arial, sans-serif; margin: 0 auto; max-width: 1100px;}
+h1, h3 {text-align: center; font-weight: normal;}
+table {border-collapse: collapse; width: 100%;}
+th {background: lightgrey;}
+th, td {border: 1px solid #ddd; padding: 4px; text-align: center; font-size: 12px;}
+.pager {text-align: center; margin: 8px;}
+</style>
+</head>
+<body>
+<h1>$title</h1>
+<h3>$table_title</h3>
+<table id="report-table"><thead><tr>$header</tr></thead><tbody></tbody></table>
+<div class="pager">
+<button id="previous-page">&lt;</button> <span id="page-label"></span> <button id="next-page">&gt;</button>
+</div>
+$figure
+<script type="application/json" id="report-data">$data</script>
+<script>
+(function () {
+    var rows = JSON.parse(document.getElementById('report-data').textContent);
+    var pageSize = $page_size, page = 0, pages = Math.max(1, Math.ceil(rows.length / pageSize));
+    var body = document.querySelector('#report-table tbody');
+    function cell(value) {
+        var td = document.createElement('td');
+        td.textContent = value === null ? '' : value;
+        return td;
+    }
+    function render() {
+        body.textContent = '';
+        rows.slice(page * pageSize, (page + 1) * pageSize).forEach(function (row) {
+            var tr = document.createElement('tr');
+            row.forEach(function (value) { tr.appendChild(cell(value)); });
+            body.appendChild(tr);
+        });
+        document.getElementById('page-label').textContent = (page + 1) + ' / ' + pages;
+    }
+    document.getElementById('previous-page').onclick = function () { if (page > 0) { page--; render(); } };
+    document.getElementById('next-page').onclick = function () { if (page < pages - 1) { page++; render(); } };
+    render();
+})();
+</script>
+</body>
+</html>
+""")
+
+# Fingerprint of the source files and parameters of the last written report, kept next to report.html
+REPORT_CACHE_FILE_NAME = 'report.fingerprint.json'
+
+
+@dataclass(frozen=True)
+class ReportSlice:
+    """
+    A slice of the source data rendered as one report by ReportGenerator.generate_reports.
+
+    Attributes:
+        name (str): The name of the report, written to `<name>.html`.
+        first_date (str): The first visit date of the slice, in the format 'YYYY-MM-DD'.
+        last_date (str): The last visit date of the slice, in the format 'YYYY-MM-DD'.
+        facility_type (Optional[str]): The facility type of the slice, or None for all facility types.
+    """
+    name: str
+    first_date: str
+    last_date: str
+    facility_type: Optional[str] = None
+
+
+def render_report(report_slice, table_data, doughnut_data):
+    """
+    Renders the report of one slice and writes it to `<name>.html`; runs in the worker processes of
+    ReportGenerator.generate_reports.
+
+    Args:
+        report_slice (ReportSlice): The slice to render.
+        table_data (pd.DataFrame): The sorted rows of the slice.
+        doughnut_data (pd.Series): The minimum average time spent per facility type of the slice.
+
+    Returns:
+        str: The path of the written report.
+    """
+    window = f"{report_slice.first_date} - {report_slice.last_date}"
+    scope = report_slice.facility_type or "all facility types"
+    report = ReportGenerator(data=table_data)
+    return report.render(table_data, doughnut_data, file_name=f"{report_slice.name}.html",
+                         table_title=f"Loaded data for {scope}, {window}",
+                         doughnut_title=f"Min average time spent by Facility Type, {window}")
 
 
 class ReportGenerator:
@@ -12,62 +134,262 @@ class ReportGenerator:
     A class to generate an HTML report with a table and a doughnut chart visualizing
     last week's data and the minimum average time spent by facility type.
 
+    Reports of several slices of the data (date windows, optionally of one facility type) are generated in one
+    batch with generate_reports, which loads the data once for all of them.
+
     Attributes:
-        data (pd.DataFrame): The source data loaded from a Parquet files.
-        fig (plotly.graph_objects.Figure): A combined figure containing a table and a doughnut chart.
+        fingerprint (str): The fingerprint of the source files and report parameters, taken before the data is read.
+        data (pd.DataFrame): The source data loaded from a Parquet files, None until transform_data reads it.
+        html_mode (str): 'full' or 'compact', sourced from report_generator_config.html_mode.
+        fig (plotly.graph_objects.Figure): A combined figure containing a table and a doughnut chart, or only the
+                                           doughnut chart in the 'compact' mode.
 
     Methods:
-        combine_figures(): Initializes the combined figure layout with a table and doughnut chart.
-        read_source_data(): Reads the source data from a Parquet file.
-        transform_data(): Filters and sorts the data for the last week.
+        combine_figures(table_title, doughnut_title, with_table): Initializes the combined figure layout with a
+                                                                  table and doughnut chart.
+        list_partitions(path): Returns the partition_date values of a dataset from its directory names.
+        summary_in_use(): Returns whether the report reads the rolling summary.
+        source_fingerprint(): Returns a fingerprint of the source files and report parameters.
+        read_cached_fingerprint(): Returns the fingerprint stored with the last written report.
+        write_cached_fingerprint(): Stores the fingerprint of the written report.
+        read_window_data(first_date, last_date): Reads the visit dates in a window from the Parquet dataset.
+        read_source_data(): Reads the rolling summary, or the partitions covering the last week from the Parquet
+                            dataset.
+        slice_data(data, report_slices): Computes the table and doughnut data of every slice from one sort.
+        generate_reports(report_slices): Generates the reports of many slices from one data load.
+        transform_data(): Reads the source data if it is not loaded yet, then filters and sorts it for the last week.
         create_table_element(last_week_data): Adds a table visualization to the figure.
-        create_doughnut_element(last_week_data): Adds a doughnut chart visualization to the figure.
-        update_layout(): Updates the layout of the combined figure.
-        write_html(): Writes the generated figure to an HTML file.
+        create_doughnut_element(last_week_data, doughnut_data, row): Adds a doughnut chart visualization to the
+                                                                     figure.
+        update_layout(height): Updates the layout of the combined figure.
+        write_html(file_name): Writes the generated figure to an HTML file.
+        write_plotly_js(): Writes the shared plotly.js bundle of the compact reports if it is missing.
+        write_compact_html(table_data, file_name, table_title): Writes the compact HTML report.
+        render(table_data, doughnut_data, file_name, table_title, doughnut_title): Renders and writes a report in
+                                                                                   the configured mode.
         generate_report(): Main method to generate the report.
     """
 
-    def __init__(self):
+    def __init__(self, data=None):
         """
-        Initializes the ReportGenerator instance by loading the data and setting up the figure.
+        Initializes the ReportGenerator instance by taking the source fingerprint and setting up the figure.
+
+        The source data is only read by transform_data, so a report skipped on a cache hit reads no data. The
+        fingerprint is taken before the data is read, so files changing in between only cause a cache miss on the
+        next run.
+
+        Args:
+            data (pd.DataFrame, optional): Data already loaded for the report. When given, nothing is read and
+                                           no fingerprint is taken.
         """
-        self.data = self.read_source_data()
-        self.fig = self.combine_figures()
+        if data is None:
+            self.fingerprint = self.source_fingerprint()
+        else:
+            self.fingerprint = None
+        self.data = data
+        self.html_mode = report_generator_config.html_mode
+        self.fig = self.combine_figures(with_table=self.html_mode != 'compact')
 
     @staticmethod
-    def combine_figures():
+    def combine_figures(table_title="Last week loaded data",
+                        doughnut_title="Min average time spent by Facility Type for the last week", with_table=True):
         """
         Creates a combined figure layout with a table and a doughnut chart.
 
+        Args:
+            table_title (str): The title of the table.
+            doughnut_title (str): The title of the doughnut chart.
+            with_table (bool): Whether the figure holds the table; without it the figure holds only the doughnut
+                               chart, in its first row.
+
         Returns:
             plotly.graph_objects.Figure: A figure with two subplots - a table and a doughnut chart.
         """
+        if not with_table:
+            return make_subplots(rows=1, cols=1, specs=[[{"type": "domain"}]], subplot_titles=(doughnut_title,))
         return make_subplots(
             rows=2, cols=1,
             specs=[[{"type": "table"}], [{"type": "domain"}]],
-            subplot_titles=("Last week loaded data", "Min average time spent by Facility Type for the last week")
+            subplot_titles=(table_title, doughnut_title)
+        )
+
+    @staticmethod
+    def list_partitions(path):
+        """
+        Returns the partition_date values of a dataset from the names of its partition directories.
+
+        Args:
+            path (str): The dataset directory.
+
+        Returns:
+            List[str]: The sorted 'YYYY-MM' partition values.
+        """
+        return sorted(
+            entry.name.split('=', 1)[1] for entry in os.scandir(path)
+            if entry.is_dir() and entry.name.startswith('partition_date=')
         )
 
+    @staticmethod
+    def summary_in_use():
+        """
+        Returns whether the report reads the rolling summary: summary_file_path is set, the summary exists and
+        its window holds at least REPORT_WINDOW_DAYS days. Only the footer of the summary is read.
+
+        Returns:
+            bool: True if the report reads the rolling summary.
+        """
+        summary_path = report_generator_config.summary_file_path
+        if not summary_path or not os.path.exists(summary_path):
+            return False
+        metadata = json.loads(pq.read_schema(summary_path).metadata[REPORT_SUMMARY_METADATA_KEY])
+        return metadata['window_days'] >= REPORT_WINDOW_DAYS
+
+    @staticmethod
+    def source_fingerprint():
+        """
+        Returns a fingerprint of the source files and report parameters.
+
+        The fingerprint covers the name, size and modification time of the rolling summary if the report reads
+        it, otherwise of every file in the two latest partitions, which hold every week the report can show, or
+        of every file of an unpartitioned dataset, and the report parameters, including the plotly version the
+        report is rendered with. Hidden and underscore-prefixed files, such as the export state, are left out.
+
+        Returns:
+            str: The hex SHA-256 digest of the fingerprint.
+        """
+        path = report_generator_config.parquet_files_path
+        partitions = ReportGenerator.list_partitions(path)
+        roots = [os.path.join(path, f"partition_date={partition}") for partition in partitions[-2:]] or [path]
+        files = []
+        if ReportGenerator.summary_in_use():
+            summary_path = report_generator_config.summary_file_path
+            stat = os.stat(summary_path)
+            files.append([summary_path, stat.st_size, stat.st_mtime_ns])
+            roots = []
+        for root in roots:
+            for directory, directory_names, file_names in os.walk(root):
+                directory_names[:] = [name for name in directory_names if not name.startswith(('.', '_'))]
+                for name in file_names:
+                    if name.startswith(('.', '_')):
+                        continue
+                    file_path = os.path.join(directory, name)
+                    stat = os.stat(file_path)
+                    files.append([os.path.relpath(file_path, path), stat.st_size, stat.st_mtime_ns])
+        parameters = {
+            'parquet_files_path': path,
+            'window_days': REPORT_WINDOW_DAYS,
+            'plotly_version': plotly.__version__,
+            'html_mode': report_generator_config.html_mode,
+            'table_page_size': report_generator_config.table_page_size
+        }
+        payload = json.dumps({'files': sorted(files), 'parameters': parameters}, sort_keys=True)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    @staticmethod
+    def read_cached_fingerprint():
+        """
+        Returns the fingerprint stored with the last written report.
+
+        Returns:
+            str or None: The stored fingerprint, or None if no report or no fingerprint has been written.
+        """
+        path = os.path.join(report_generator_config.storage_path, REPORT_CACHE_FILE_NAME)
+        if not os.path.exists(path) or not os.path.exists(os.path.join(report_generator_config.storage_path,
+                                                                         "report.html")):
+            return None
+        with open(path) as cache_file:
+            return json.load(cache_file).get('fingerprint')
+
+    def write_cached_fingerprint(self):
+        """
+        Stores the fingerprint of the written report next to it.
+        """
+        path = os.path.join(report_generator_config.storage_path, REPORT_CACHE_FILE_NAME)
+        with open(f"{path}.tmp", 'w') as cache_file:
+            json.dump({'fingerprint': self.fingerprint}, cache_file)
+        os.replace(f"{path}.tmp", path)
+
+    @staticmethod
+    def read_window_data(first_date, last_date=None):
+        """
+        Reads the rows with a visit date in [first_date, last_date] from the Parquet dataset specified in the
+        configuration.
+
+        Only the partition_date directories overlapping the window are scanned, with the report's columns
+        projected and the window pushed down as a filter. A dataset without partition_date directories is
+        scanned whole with the same filter.
+
+        Args:
+            first_date (pd.Timestamp): The first visit date.
+            last_date (pd.Timestamp, optional): The last visit date, or None for no upper bound.
+
+        Returns:
+            pd.DataFrame: The loaded data.
+        """
+        path = report_generator_config.parquet_files_path
+        columns = ['facility_type', 'visit_date', 'avg_time_spent']
+        all_partitions = ReportGenerator.list_partitions(path)
+        partitions = [
+            partition for partition in all_partitions
+            if first_date.strftime('%Y-%m') <= partition
+            and (last_date is None or partition <= last_date.strftime('%Y-%m'))
+        ]
+        if not all_partitions:
+            dataset = ds.dataset(path, format='parquet')
+        elif not partitions:
+            return pd.DataFrame(columns=columns)
+        else:
+            dataset = ds.dataset([ds.dataset(os.path.join(path, f"partition_date={partition}"), format='parquet')
+                                  for partition in partitions])
+        visit_date_type = dataset.schema.field('visit_date').type
+        condition = pc.field('visit_date') >= pa.scalar(first_date.to_pydatetime(), visit_date_type)
+        if last_date is not None:
+            condition &= pc.field('visit_date') <= pa.scalar(last_date.to_pydatetime(), visit_date_type)
+        return dataset.to_table(columns=columns, filter=condition).to_pandas()
+
     @staticmethod
     def read_source_data():
         """
-        Reads the source data from a Parquet file specified in the configuration.
+        Reads the data of the last week from the rolling summary or the Parquet dataset specified in the
+        configuration.
+
+        The rolling summary maintained by LoadParquet is read whole when summary_in_use. Otherwise the latest
+        partition is found from the directory layout and only its visit dates are read to find the last loaded
+        date. Then only the partitions covering the week up to that date are scanned, with the report's columns
+        projected and the week pushed down as a filter, so the read does not grow with the history kept in the
+        dataset. A dataset without partition_date directories is read whole.
 
         Returns:
             pd.DataFrame: The loaded data.
         """
-        return pd.read_parquet(report_generator_config.parquet_files_path)
+        if ReportGenerator.summary_in_use():
+            summary, _ = read_report_summary(report_generator_config.summary_file_path)
+            return summary.to_pandas()
+        path = report_generator_config.parquet_files_path
+        partitions = ReportGenerator.list_partitions(path)
+        if not partitions:
+            return pd.read_parquet(path, columns=['facility_type', 'visit_date', 'avg_time_spent'])
+        latest_partition = os.path.join(path, f"partition_date={partitions[-1]}")
+        last_loaded_date = pc.max(ds.dataset(latest_partition, format='parquet').to_table(
+            columns=['visit_date'])['visit_date']).as_py()
+        first_date = pd.Timestamp(last_loaded_date) - pd.Timedelta(days=REPORT_WINDOW_DAYS - 1)
+        return ReportGenerator.read_window_data(first_date)
 
     def transform_data(self):
         """
         Filters the data for the last week and sorts it by visit date and facility type.
 
+        The source data is read first if it has not been loaded yet.
+
         Returns:
             pd.DataFrame: The transformed data for the last week.
         """
+        if self.data is None:
+            self.data = self.read_source_data()
         self.data['visit_date'] = pd.to_datetime(self.data['visit_date'])
         last_loaded_date = self.data['visit_date'].max()
-        last_week_data = self.data[self.data['visit_date'] >= (last_loaded_date - pd.Timedelta(days=6))]
+        first_date = last_loaded_date - pd.Timedelta(days=REPORT_WINDOW_DAYS - 1)
+        last_week_data = self.data[self.data['visit_date'] >= first_date]
         last_week_data = last_week_data.sort_values(by=['visit_date', 'facility_type'], ascending=False)
         return last_week_data
 
@@ -81,7 +403,7 @@ class ReportGenerator:
         self.fig.add_trace(
             go.Table(
                 header=dict(
-                    values=["Facility Type", "Visit Date", "Average Time Spent"],
+                    values=TABLE_COLUMNS,
                     fill_color="lightgrey",
                     align="center",
                     font=dict(size=12, color="black"),
@@ -100,14 +422,18 @@ class ReportGenerator:
             row=1, col=1
         )
 
-    def create_doughnut_element(self, last_week_data):
+    def create_doughnut_element(self, last_week_data, doughnut_data=None, row=2):
         """
         Adds a doughnut chart visualization to the figure.
 
         Args:
             last_week_data (pd.DataFrame): The data for the last week to be visualized.
+            doughnut_data (pd.Series, optional): The minimum average time spent per facility type, if already
+                                                 computed from last_week_data.
+            row (int): The figure row of the doughnut chart.
         """
-        doughnut_data = last_week_data.groupby('facility_type')['avg_time_spent'].min()
+        if doughnut_data is None:
+            doughnut_data = last_week_data.groupby('facility_type')['avg_time_spent'].min()
         self.fig.add_trace(
             go.Pie(
                 labels=doughnut_data.index,
@@ -116,41 +442,197 @@ class ReportGenerator:
                 textinfo='label+value',  # Show actual values instead of percentages
                 textfont=dict(size=14)  # Adjust font size for better readability
             ),
-            row=2, col=1
+            row=row, col=1
         )
 
-    def update_layout(self):
+    def update_layout(self, height=800):
         """
         Updates the layout of the combined figure, including height and title.
+
+        Args:
+            height (int): The height of the figure in pixels.
         """
         self.fig.update_layout(
-            height=800,
-            title_text='DQE Automation - "BI" HTML Report with Table and Doughnut Chart',
+            height=height,
+            title_text=REPORT_TITLE,
             title_x=0.5
         )
 
-    def write_html(self):
+    def write_html(self, file_name="report.html"):
         """
         Writes the generated figure to an HTML file in the specified storage path.
 
-        The file is named "report.html".
+        Args:
+            file_name (str): The name of the file, "report.html" by default.
+
+        Returns:
+            str: The path of the written file.
+        """
+        os.makedirs(report_generator_config.storage_path, exist_ok=True)
+        path = os.path.join(report_generator_config.storage_path, file_name)
+        pio.write_html(self.fig, file=path, auto_open=False)
+        return path
+
+    @staticmethod
+    def write_plotly_js():
+        """
+        Writes the plotly.js bundle shared by the compact reports to the storage path if it is missing.
+
+        The bundle is written to a temporary file and renamed, so reports rendered in parallel never reference
+        a partly written bundle.
         """
+        path = os.path.join(report_generator_config.storage_path, PLOTLY_JS_FILE_NAME)
+        if os.path.exists(path):
+            return
         os.makedirs(report_generator_config.storage_path, exist_ok=True)
-        pio.write_html(self.fig, file=os.path.join(report_generator_config.storage_path, "report.html"),
-                       auto_open=False)
+        temporary_path = f"{path}.{os.getpid()}.tmp"
+        with open(temporary_path, 'w', encoding='utf-8') as bundle_file:
+            bundle_file.write(get_plotlyjs())
+        os.replace(temporary_path, path)
+
+    def write_compact_html(self, table_data, file_name="report.html", table_title="Last week loaded data"):
+        """
+        Writes the report as a compact HTML file to the specified storage path.
+
+        The page references the shared plotly.js bundle instead of inlining it, the figure holds only the
+        doughnut chart, and the table rows are embedded as compact JSON and rendered as a paginated HTML table
+        of table_page_size rows, so the file size and render time do not grow with a plotly table per row.
+
+        Args:
+            table_data (pd.DataFrame): The rows of the table.
+            file_name (str): The name of the file, "report.html" by default.
+            table_title (str): The title of the table.
+
+        Returns:
+            str: The path of the written file.
+        """
+        self.write_plotly_js()
+        rows = pd.DataFrame({
+            'facility_type': table_data['facility_type'],
+            'visit_date': table_data['visit_date'].dt.strftime('%Y-%m-%d'),
+            'avg_time_spent': table_data['avg_time_spent']
+        }).astype(object)
+        rows = rows.where(rows.notna(), None).values.tolist()
+        page = COMPACT_REPORT_TEMPLATE.substitute(
+            title=html.escape(REPORT_TITLE),
+            plotly_js=PLOTLY_JS_FILE_NAME,
+            table_title=html.escape(table_title),
+            header=''.join(f"<th>{html.escape(column)}</th>" for column in TABLE_COLUMNS),
+            figure=pio.to_html(self.fig, include_plotlyjs=False, full_html=False),
+            data=json.dumps(rows, separators=(',', ':')).replace('</', '<\\/'),
+            page_size=report_generator_config.table_page_size
+        )
+        path = os.path.join(report_generator_config.storage_path, file_name)
+        with open(path, 'w', encoding='utf-8') as report_file:
+            report_file.write(page)
+        return path
+
+    def render(self, table_data, doughnut_data=None, file_name="report.html", table_title="Last week loaded data",
+               doughnut_title="Min average time spent by Facility Type for the last week"):
+        """
+        Renders the table and doughnut chart of the given rows and writes the report in the configured mode.
+
+        Args:
+            table_data (pd.DataFrame): The sorted rows of the table.
+            doughnut_data (pd.Series, optional): The minimum average time spent per facility type, if already
+                                                 computed from table_data.
+            file_name (str): The name of the file, "report.html" by default.
+            table_title (str): The title of the table.
+            doughnut_title (str): The title of the doughnut chart.
+
+        Returns:
+            str: The path of the written file.
+        """
+        if self.html_mode == 'compact':
+            self.fig = self.combine_figures(table_title, doughnut_title, with_table=False)
+            self.create_doughnut_element(table_data, doughnut_data, row=1)
+            self.update_layout(height=450)
+            return self.write_compact_html(table_data, file_name, table_title)
+        self.fig = self.combine_figures(table_title, doughnut_title)
+        self.create_table_element(table_data)
+        self.create_doughnut_element(table_data, doughnut_data)
+        self.update_layout()
+        return self.write_html(file_name)
+
+    @staticmethod
+    def slice_data(data, report_slices):
+        """
+        Computes the table and doughnut data of every slice from one sort of the data.
+
+        The data is sorted by visit date once, and the rows of each slice's window are found with a binary
+        search over the sorted dates, so memory grows with the selected rows rather than rows times slices.
+
+        Args:
+            data (pd.DataFrame): The loaded data covering every slice.
+            report_slices (List[ReportSlice]): The slices.
+
+        Returns:
+            List[Tuple[pd.DataFrame, pd.Series]]: The sorted rows and the minimum average time spent per
+                                                  facility type of every slice, in slice order.
+        """
+        data = data.assign(visit_date=pd.to_datetime(data['visit_date']))
+        data = data.sort_values(by='visit_date', kind='stable', ignore_index=True)
+        visit_dates = data['visit_date'].to_numpy()
+        first_dates = pd.to_datetime([report_slice.first_date for report_slice in report_slices]).to_numpy()
+        last_dates = pd.to_datetime([report_slice.last_date for report_slice in report_slices]).to_numpy()
+        starts = np.searchsorted(visit_dates, first_dates, side='left')
+        ends = np.searchsorted(visit_dates, last_dates, side='right')
+        results = []
+        for report_slice, start, end in zip(report_slices, starts, ends):
+            table = data.iloc[start:max(start, end)]
+            if report_slice.facility_type is not None:
+                table = table[table['facility_type'] == report_slice.facility_type]
+            doughnut = table.groupby('facility_type')['avg_time_spent'].min()
+            table = table.sort_values(by=['visit_date', 'facility_type'], ascending=False)
+            results.append((table, doughnut))
+        return results
+
+    @classmethod
+    def generate_reports(cls, report_slices):
+        """
+        Generates the reports of many slices of the data from one data load.
+
+        The data covering all slices is read once, the slices are computed with slice_data, and the reports are
+        rendered and written by render_report in report_generator_config.num_workers processes.
+
+        Args:
+            report_slices (List[ReportSlice]): The slices, with unique names.
+
+        Returns:
+            List[str]: The paths of the written reports, in slice order.
+        """
+        if not report_slices:
+            return []
+        first_date = min(pd.Timestamp(report_slice.first_date) for report_slice in report_slices)
+        last_date = max(pd.Timestamp(report_slice.last_date) for report_slice in report_slices)
+        data = cls.read_window_data(first_date, last_date)
+        logging.info(f"Loaded {len(data)} rows for {len(report_slices)} reports")
+        slices = cls.slice_data(data, report_slices)
+        tasks = [(report_slice, table_data, doughnut_data)
+                 for report_slice, (table_data, doughnut_data) in zip(report_slices, slices)]
+        if report_generator_config.num_workers > 1:
+            with ProcessPoolExecutor(max_workers=report_generator_config.num_workers) as executor:
+                return list(executor.map(render_report, *zip(*tasks)))
+        return [render_report(*task) for task in tasks]
 
     def generate_report(self):
         """
         Main method to generate the HTML report.
 
         This method:
+        - Skips the report if use_cache is enabled and the source fingerprint matches the last written report.
         - Transforms the source data to filter the last week's data.
-        - Creates a table and doughnut chart elements.
+        - Creates a table and doughnut chart elements, in the figure or as a paginated HTML table in the
+          'compact' mode.
         - Updates the layout of the figure.
-        - Writes the figure to an HTML file.
+        - Writes the figure to an HTML file, and its fingerprint if use_cache is enabled.
         """
+        if report_generator_config.use_cache:
+            if self.fingerprint == self.read_cached_fingerprint():
+                logging.info(f"Report cache hit ({self.fingerprint[:12]}), report.html is up to date")
+                return
+            logging.info(f"Report cache miss ({self.fingerprint[:12]}), generating report.html")
         last_week_data = self.transform_data()
-        self.create_table_element(last_week_data)
-        self.create_doughnut_element(last_week_data)
-        self.update_layout()
-        self.write_html()
+        self.render(last_week_data)
+        if report_generator_config.use_cache:
+            self.write_cached_fingerprint()